@@ -0,0 +1,136 @@
+# assets.py
+import base64
+import os
+import struct
+import threading
+import time
+import tkinter as tk
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# every file the game needs, checked before the first frame
+SHAPES = [
+    "plat.gif", "plat100.gif", "plat120.gif", "plat140.gif", "plat160.gif",
+    "plat180.gif", "plat200.gif", "plat220.gif", "plat240.gif",
+    "student2.gif", "studentprawo.gif", "studentlewo.gif",
+    "image.gif"
+]
+BACKGROUND = "backgroundAGH.gif"
+BACKGROUND_TILE_HEIGHT = 128  # px; 1536 px of background make 12 tiles
+SOUNDS = ["cartoonjump.wav", "yay.wav"]
+IMAGES = [BACKGROUND] + SHAPES
+MANIFEST = IMAGES + SOUNDS
+
+
+class AssetCache:
+    # process-wide cache: files are read once, images are decoded once
+    #
+    # reading happens on a background thread; decoding creates Tk images
+    # and therefore has to run on the Tk thread through image().
+
+    def __init__(self, directory=ASSET_DIR):
+        self.directory = directory
+        self.data = {}  # name -> raw bytes
+        self.images = {}  # name -> tk.PhotoImage
+        self.tiles = {}  # tile name -> (source name, left, top, right, bottom)
+        self.timings = {}  # name -> seconds spent reading and decoding
+        self._lock = threading.Lock()
+        self._thread = None
+        self.error = None
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def check(self, names=MANIFEST):
+        # fail at startup when any asset is missing
+        missing = [name for name in names if not os.path.isfile(self.path(name))]
+        if missing:
+            raise FileNotFoundError(f"Missing game assets: {', '.join(missing)}")
+
+    def read(self, name):
+        # raw file contents, read from disk only the first time
+        data = self.data.get(name)
+        if data is None:
+            start = time.perf_counter()
+            with open(self.path(name), "rb") as asset:
+                data = asset.read()
+            with self._lock:
+                self.data[name] = data
+                self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+        return data
+
+    def preload(self, names=MANIFEST):
+        # start reading files on a background thread
+        self.check(names)
+        self._thread = threading.Thread(target=self._read_all, args=(list(names),),
+                                        name="asset-preload", daemon=True)
+        self._thread.start()
+
+    def _read_all(self, names):
+        try:
+            for name in names:
+                self.read(name)
+        except OSError as e:
+            self.error = e
+
+    def is_loaded(self, name):
+        with self._lock:
+            return name in self.data
+
+    def done(self):
+        return self._thread is None or not self._thread.is_alive()
+
+    def image(self, name):
+        # decoded Tk image; must be called on the Tk thread
+        photo = self.images.get(name)
+        if photo is None:
+            tile = self.tiles.get(name)
+            if tile is not None:
+                return self._cut_tile(name, *tile)
+            data = self.read(name)
+            start = time.perf_counter()
+            photo = tk.PhotoImage(data=base64.b64encode(data))
+            self.images[name] = photo
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+        return photo
+
+    def size(self, name):
+        # (width, height) of a GIF from its header, without decoding it
+        return struct.unpack_from("<HH", self.read(name), 6)
+
+    def cell_names(self, name, width, height):
+        # names of the width x height cells of an image, row by row; each
+        # cell is cut from the decoded image by image() the first time it is asked for
+        image_width, image_height = self.size(name)
+        names = []
+        for top in range(0, image_height - height + 1, height):
+            for left in range(0, image_width - width + 1, width):
+                cell = f"{name}#{width}x{height}:{len(names)}"
+                self.tiles[cell] = (name, left, top, left + width, top + height)
+                names.append(cell)
+        return names
+
+    def tile_names(self, name, height):
+        # full width horizontal strips of an image, top strip first
+        return self.cell_names(name, self.size(name)[0], height)
+
+    def _cut_tile(self, name, source, left, top, right, bottom):
+        photo = self.image(source)
+        start = time.perf_counter()
+        tile = tk.PhotoImage(width=right - left, height=bottom - top)
+        tile.tk.call(tile, "copy", photo, "-from", left, top, right, bottom)
+        self.images[name] = tile
+        self.timings[name] = time.perf_counter() - start
+        return tile
+
+    def report(self):
+        # total and slowest load times in milliseconds
+        if not self.timings:
+            return "No assets loaded"
+        slowest = max(self.timings, key=self.timings.get)
+        total = sum(self.timings.values())
+        return (f"Assets loaded: {len(self.timings)} files in {total * 1000:.1f} ms "
+                f"(slowest: {slowest} {self.timings[slowest] * 1000:.1f} ms)")
+
+
+ASSETS = AssetCache()
@@ -0,0 +1,303 @@
+# atlas.py
+import argparse
+import hashlib
+import math
+import os
+import struct
+import time
+from assets import ASSETS
+
+# player rotation frames generated from one sprite
+#
+# every frame is rotated from the source GIF and all frames are stored side
+# by side in one atlas GIF, cached on disk under a hash of the source. the
+# game reads and decodes the atlas once and cuts the frames out of it like
+# the background tiles, so no image work happens per frame.
+
+PLAYER_SPRITE = "student2.gif"
+ROTATION_FRAMES = 64
+ATLAS_DIR = "atlas_cache"  # relative to the asset directory
+ATLAS_VERSION = 2  # part of the cache key; bump when the generated images change
+MAX_CODE_SIZE = 12
+
+
+def lzw_decode(data, min_size, count):
+    # GIF flavoured LZW: variable code size from min_size + 1 up to 12 bits
+    clear = 1 << min_size
+    end = clear + 1
+    table = [bytes((i,)) for i in range(clear)] + [b"", b""]
+    size = min_size + 1
+    out = bytearray()
+    prev = None
+    acc = bits = 0
+    position = 0
+    while len(out) < count:
+        while bits < size:
+            if position == len(data):
+                return out
+            acc |= data[position] << bits
+            bits += 8
+            position += 1
+        code = acc & ((1 << size) - 1)
+        acc >>= size
+        bits -= size
+        if code == clear:
+            del table[clear + 2:]
+            size = min_size + 1
+            prev = None
+            continue
+        if code == end:
+            break
+        if code < len(table):
+            entry = table[code]
+            if prev is not None and len(table) < 1 << MAX_CODE_SIZE:
+                table.append(prev + entry[:1])
+        else:
+            entry = prev + prev[:1]
+            table.append(entry)
+        out += entry
+        prev = entry
+        if len(table) == 1 << size and size < MAX_CODE_SIZE:
+            size += 1
+    return out[:count]
+
+
+def lzw_encode(pixels, min_size):
+    clear = 1 << min_size
+    end = clear + 1
+    out = bytearray()
+    acc = bits = 0
+
+    def reset():
+        return {}, end + 1, min_size + 1
+
+    table, next_code, size = reset()
+    codes = [(clear, size)]
+    prefix = pixels[0]
+    for value in pixels[1:]:
+        key = prefix << 8 | value
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        codes.append((prefix, size))
+        if next_code < 1 << MAX_CODE_SIZE:
+            table[key] = next_code
+            next_code += 1
+            if next_code > 1 << size and size < MAX_CODE_SIZE:
+                size += 1
+        else:
+            codes.append((clear, size))
+            table, next_code, size = reset()
+        prefix = value
+    codes.append((prefix, size))
+    codes.append((end, size))
+
+    for code, width in codes:
+        acc |= code << bits
+        bits += width
+        while bits >= 8:
+            out.append(acc & 0xFF)
+            acc >>= 8
+            bits -= 8
+    if bits:
+        out.append(acc)
+    return bytes(out)
+
+
+def read_gif(data):
+    # first image of a GIF as (width, height, palette, pixels, transparent index or None);
+    # pixels holds one palette index per pixel, row by row
+    if data[:6] not in (b"GIF87a", b"GIF89a"):
+        raise ValueError("not a GIF file")
+    width, height, flags = struct.unpack_from("<HHB", data, 6)
+    position = 13
+    palette = b""
+    if flags & 0x80:
+        size = 3 << ((flags & 7) + 1)
+        palette = data[position:position + size]
+        position += size
+    transparent = None
+    while position < len(data):
+        block = data[position]
+        position += 1
+        if block == 0x21:  # extension: only the graphic control block matters
+            label = data[position]
+            position += 1
+            if label == 0xF9 and data[position] >= 4 and data[position + 1] & 1:
+                transparent = data[position + 4]
+            while data[position]:
+                position += data[position] + 1
+            position += 1
+        elif block == 0x2C:  # image descriptor
+            left, top, frame_width, frame_height, flags = struct.unpack_from("<HHHHB", data, position)
+            position += 9
+            if flags & 0x80:
+                size = 3 << ((flags & 7) + 1)
+                palette = data[position:position + size]
+                position += size
+            min_size = data[position]
+            position += 1
+            chunks = []
+            while data[position]:
+                chunks.append(data[position + 1:position + 1 + data[position]])
+                position += data[position] + 1
+            frame = lzw_decode(b"".join(chunks), min_size, frame_width * frame_height)
+            frame += bytes(frame_width * frame_height - len(frame))
+            if flags & 0x40:
+                frame = deinterlace(frame, frame_width, frame_height)
+            background = transparent if transparent is not None else 0
+            pixels = bytearray((background,)) * (width * height)
+            for row in range(frame_height):
+                start = (top + row) * width + left
+                pixels[start:start + frame_width] = frame[row * frame_width:(row + 1) * frame_width]
+            return width, height, palette, pixels, transparent
+        else:
+            break
+    raise ValueError("GIF file has no image")
+
+
+def deinterlace(frame, width, height):
+    rows = [row for start, step in ((0, 8), (4, 8), (2, 4), (1, 2)) for row in range(start, height, step)]
+    pixels = bytearray(len(frame))
+    for source, row in enumerate(rows):
+        pixels[row * width:(row + 1) * width] = frame[source * width:(source + 1) * width]
+    return pixels
+
+
+def write_gif(width, height, palette, pixels, transparent=None):
+    # GIF89a bytes of one image; palette is padded to a power of two
+    colors = max(2, 1 << max(1, math.ceil(math.log2(max(1, len(palette) // 3)))))
+    depth = colors.bit_length() - 1
+    palette = palette[:colors * 3].ljust(colors * 3, b"\0")
+    out = bytearray(b"GIF89a")
+    out += struct.pack("<HHBBB", width, height, 0x80 | (depth - 1) << 4 | (depth - 1), 0, 0)
+    out += palette
+    if transparent is not None:
+        out += struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 1, 0, transparent, 0)
+    out += struct.pack("<BHHHHB", 0x2C, 0, 0, width, height, 0)
+    min_size = max(2, depth)
+    out.append(min_size)
+    data = lzw_encode(pixels, min_size)
+    for start in range(0, len(data), 255):
+        chunk = data[start:start + 255]
+        out.append(len(chunk))
+        out += chunk
+    out += b"\0;"
+    return bytes(out)
+
+
+def rotate(width, height, pixels, angle, size, fill):
+    # size x size nearest neighbour copy of the image turned clockwise by angle degrees
+    cos = math.cos(math.radians(angle))
+    sin = math.sin(math.radians(angle))
+    centre_x = (width - 1) / 2
+    centre_y = (height - 1) / 2
+    middle = (size - 1) / 2
+    out = bytearray((fill,)) * (size * size)
+    for y in range(size):
+        dy = y - middle
+        row = y * size
+        for x in range(size):
+            dx = x - middle
+            # inverse rotation: where this pixel comes from in the source;
+            # round() would send .5 alternately down and up, doubling pixels
+            source_x = math.floor(centre_x + dx * cos + dy * sin + 0.5)
+            source_y = math.floor(centre_y - dx * sin + dy * cos + 0.5)
+            if 0 <= source_x < width and 0 <= source_y < height:
+                out[row + x] = pixels[source_y * width + source_x]
+    return out
+
+
+def cell_size(width, height):
+    # square cell holding the sprite at any angle; same parity as the width,
+    # so the unturned frame lines up with the source pixel grid
+    size = math.ceil(math.hypot(width, height))
+    return size + (size - width) % 2
+
+
+def build_atlas(data, frames=ROTATION_FRAMES):
+    # atlas GIF bytes: frames square cells in one row, frame i turned by i * 360 / frames degrees
+    width, height, palette, pixels, transparent = read_gif(data)
+    if transparent is None:
+        # the corners around a turned frame need a transparent colour
+        transparent = len(palette) // 3
+        palette += b"\0\0\0"
+        if transparent >= 256:
+            raise ValueError("sprite palette has no room for a transparent colour")
+    size = cell_size(width, height)
+    cells = [rotate(width, height, pixels, i * 360 / frames, size, transparent) for i in range(frames)]
+    atlas = bytearray(size * frames * size)
+    stride = size * frames
+    for i, cell in enumerate(cells):
+        for y in range(size):
+            start = y * stride + i * size
+            atlas[start:start + size] = cell[y * size:(y + 1) * size]
+    return write_gif(stride, size, palette, atlas, transparent)
+
+
+def atlas_name(data, frames=ROTATION_FRAMES, source=PLAYER_SPRITE):
+    # asset name of the cached atlas for these source bytes
+    digest = hashlib.sha1(data + struct.pack("<HH", frames, ATLAS_VERSION)).hexdigest()[:16]
+    return f"{ATLAS_DIR}/{os.path.splitext(source)[0]}-{frames}-{digest}.gif"
+
+
+def ensure_atlas(source=PLAYER_SPRITE, frames=ROTATION_FRAMES):
+    # asset name of the atlas, generated and written to the cache when missing
+    data = ASSETS.read(source)
+    name = atlas_name(data, frames, source)
+    path = ASSETS.path(name)
+    if not os.path.isfile(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as output:
+            output.write(build_atlas(data, frames))
+        os.replace(temporary, path)  # never leave a half written atlas under the final name
+    return name
+
+
+_frames = {}  # (source, frames) -> frame names
+
+
+def rotation_frames(source=PLAYER_SPRITE, frames=ROTATION_FRAMES):
+    # shape names of the rotation frames, frame i turned by i * 360 / frames degrees clockwise
+    key = (source, frames)
+    if key not in _frames:
+        name = ensure_atlas(source, frames)
+        size = ASSETS.size(name)[1]
+        _frames[key] = ASSETS.cell_names(name, size, size)
+    return _frames[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the cached player rotation atlas")
+    parser.add_argument("--source", default=PLAYER_SPRITE)
+    parser.add_argument("--frames", type=int, default=ROTATION_FRAMES)
+    parser.add_argument("--rebuild", action="store_true", help="regenerate even when cached")
+    args = parser.parse_args()
+
+    path = ASSETS.path(atlas_name(ASSETS.read(args.source), args.frames, args.source))
+    if args.rebuild and os.path.isfile(path):
+        os.remove(path)
+    cached = os.path.isfile(path)
+    start = time.perf_counter()
+    name = ensure_atlas(args.source, args.frames)
+    elapsed = time.perf_counter() - start
+
+    # the cached file must decode to one square cell per frame
+    atlas = ASSETS.read(name)
+    width, height, palette, pixels, transparent = read_gif(atlas)
+    assert width == height * args.frames and transparent is not None, (width, height, transparent)
+    # frame 0 is the source itself, pixel for pixel, centred in its cell
+    source_width, source_height, _, source_pixels, _ = read_gif(ASSETS.read(args.source))
+    left = (height - source_width) // 2
+    top = (height - source_height) // 2
+    for y in range(source_height):
+        start = (top + y) * width + left
+        assert pixels[start:start + source_width] == source_pixels[y * source_width:(y + 1) * source_width], y
+    print(f"{name}: {args.frames} frames of {height}x{height} px, {len(atlas)} bytes, "
+          f"{'cached' if cached else f'built in {elapsed * 1000:.0f} ms'}")
+
+
+if __name__ == "__main__":
+    main()
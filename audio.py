@@ -0,0 +1,242 @@
+# audio.py
+import io
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import wave
+from array import array
+from itertools import combinations, zip_longest
+from assets import ASSETS, SOUNDS
+
+# sounds are decoded once; the game thread only queues names, a worker mixes and plays
+
+
+class Sample:
+    # decoded PCM data of a WAV file
+
+    __slots__ = ('name', 'channels', 'width', 'rate', 'frames')
+
+    def __init__(self, name, data):
+        self.name = name
+        with wave.open(io.BytesIO(data)) as wav:
+            self.channels = wav.getnchannels()
+            self.width = wav.getsampwidth()
+            self.rate = wav.getframerate()
+            self.frames = wav.readframes(wav.getnframes())
+
+    def params(self):
+        return self.channels, self.width, self.rate
+
+
+def encode_wav(channels, width, rate, frames):
+    # PCM frames as a complete in-memory WAV file
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+
+def can_mix(samples):
+    # one sound, or 16-bit sounds that share channels and rate
+    first = samples[0]
+    return len(samples) == 1 or (first.width == 2 and
+                                 all(sample.params() == first.params() for sample in samples))
+
+
+def mix(samples):
+    # sum 16-bit samples of the same format into one WAV, clipping to the int16 range
+    first = samples[0]
+    if len(samples) == 1:
+        return encode_wav(*first.params(), first.frames)
+
+    tracks = []
+    for sample in samples:
+        track = array('h', sample.frames)
+        if sys.byteorder == "big":
+            track.byteswap()
+        tracks.append(track)
+
+    mixed = array('h', [32767 if total > 32767 else -32768 if total < -32768 else total
+                        for total in map(sum, zip_longest(*tracks, fillvalue=0))])
+
+    if sys.byteorder == "big":
+        mixed.byteswap()
+    return encode_wav(*first.params(), mixed.tobytes())
+
+
+class NullBackend:
+    # silent backend for headless runs, counts what would have been played
+
+    def __init__(self):
+        self.played = 0
+
+    def load(self, key, wav_bytes):
+        pass
+
+    def play(self, key, wav_bytes):
+        self.played += 1
+
+    def close(self):
+        pass
+
+
+class ClipFiles:
+    # each distinct mix written to a temporary WAV file once and reused
+
+    def __init__(self):
+        self.directory = tempfile.mkdtemp(prefix="studenttower-audio-")
+        self.files = {}
+
+    def load(self, key, wav_bytes):
+        # path of the file holding wav_bytes, written the first time key is seen
+        path = self.files.get(key)
+        if path is None:
+            path = os.path.join(self.directory, f"{len(self.files)}.wav")
+            with open(path, "wb") as wav:
+                wav.write(wav_bytes)
+            self.files[key] = path
+        return path
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class WinsoundBackend(ClipFiles):
+    # Windows playback from files without waiting; a new sound cuts off the one playing
+
+    def __init__(self):
+        import winsound
+        ClipFiles.__init__(self)
+        self.winsound = winsound
+
+    def play(self, key, wav_bytes):
+        winsound = self.winsound
+        winsound.PlaySound(self.load(key, wav_bytes), winsound.SND_FILENAME | winsound.SND_ASYNC)
+
+    def close(self):
+        self.winsound.PlaySound(None, 0)  # stop before the files go away
+        ClipFiles.close(self)
+
+
+class CommandBackend(ClipFiles):
+    # plays through an external player (aplay, afplay) without waiting for it
+
+    def __init__(self, command):
+        ClipFiles.__init__(self)
+        self.command = command
+        self.processes = []
+
+    def play(self, key, wav_bytes):
+        path = self.load(key, wav_bytes)
+        # reap players that finished
+        self.processes = [process for process in self.processes if process.poll() is None]
+        self.processes.append(subprocess.Popen(self.command + [path],
+                                               stdout=subprocess.DEVNULL,
+                                               stderr=subprocess.DEVNULL))
+
+    def close(self):
+        for process in self.processes:
+            process.wait()
+        ClipFiles.close(self)
+
+
+def default_backend():
+    # best available backend for this platform, silent when there is none
+    if sys.platform == "win32":
+        return WinsoundBackend()
+    if sys.platform == "darwin" and shutil.which("afplay"):
+        return CommandBackend(["afplay"])
+    if shutil.which("aplay"):
+        return CommandBackend(["aplay", "-q"])
+    return NullBackend()
+
+
+class AudioEngine:
+    # non-blocking sound playback: play() only queues a name for the worker thread
+
+    def __init__(self):
+        self.samples = {}
+        self.mixes = {}  # tuple of names -> WAV bytes
+        self.queue = queue.SimpleQueue()
+        self.backend = None
+        self._thread = None
+
+    def start(self, backend=None, names=SOUNDS):
+        # decode samples, premix every sound and pair of sounds and hand them to
+        # the backend, then start the worker; backend defaults to the platform's
+        for name in names:
+            if name not in self.samples:
+                self.samples[name] = Sample(name, ASSETS.read(name))
+        self.backend = backend if backend is not None else default_backend()
+        for count in (1, 2):
+            for pair in combinations(sorted(self.samples), count):
+                samples = [self.samples[name] for name in pair]
+                if can_mix(samples):
+                    self.backend.load(*self._mixed(samples))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audio", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+
+    def play(self, name):
+        # called from the game thread; dropped while the engine is not running
+        if self._thread is not None:
+            self.queue.put(name)
+
+    def _run(self):
+        while True:
+            name = self.queue.get()
+            if name is None:
+                return
+            # sounds triggered together are mixed into one buffer
+            names = [name]
+            while not self.queue.empty():
+                name = self.queue.get()
+                if name is None:
+                    self._play(names)
+                    return
+                names.append(name)
+            self._play(names)
+
+    def _play(self, names):
+        # a sound queued several times before the worker woke up plays once
+        samples = [self.samples[name] for name in dict.fromkeys(names) if name in self.samples]
+        if not samples:
+            return
+        # only same-format 16-bit sounds can be summed, others play one after another
+        if not can_mix(samples):
+            for sample in samples:
+                self._play([sample.name])
+            return
+
+        key, wav_bytes = self._mixed(samples)
+        try:
+            self.backend.play(key, wav_bytes)
+        except OSError as e:
+            print(f"Warning: Could not play sound {', '.join(key)}: {e}")
+
+    def _mixed(self, samples):
+        # (key, WAV bytes) of samples played together, mixed only the first time
+        key = tuple(sorted(sample.name for sample in samples))
+        wav_bytes = self.mixes.get(key)
+        if wav_bytes is None:
+            wav_bytes = self.mixes[key] = mix(samples)
+        return key, wav_bytes
+
+
+AUDIO = AudioEngine()
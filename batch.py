@@ -0,0 +1,154 @@
+# batch.py
+import random
+import numpy as np
+from constants import (ACCELERATION, TURN_FACTOR, JUMP_DISTANCE, JUMP_FACTOR, GRAVITY,
+                       FRICTION, AIR_FRICTION, WALL_BOUNCE_FACTOR, MAX_SPEED,
+                       PLAYER_HALF_SIZE, PLAT_HALF_SIZE, WALL_HALF_SIZE,
+                       PLAYER_COLLISION_TOLERANCE, PLAYER_START_Y)
+from world import Inputs, PlayerState, World, step_player
+
+# vectorized copy of world.step_player for running many players at once
+
+DEFAULT_PARAMS = {
+    "ACCELERATION": ACCELERATION,
+    "TURN_FACTOR": TURN_FACTOR,
+    "JUMP_DISTANCE": JUMP_DISTANCE,
+    "JUMP_FACTOR": JUMP_FACTOR,
+    "GRAVITY": GRAVITY,
+    "FRICTION": FRICTION,
+    "AIR_FRICTION": AIR_FRICTION,
+    "WALL_BOUNCE_FACTOR": WALL_BOUNCE_FACTOR,
+    "MAX_SPEED": MAX_SPEED,
+}
+
+
+class BatchPlayers:
+    # state of n players as arrays, stepped against a shared set of platforms and walls
+    #
+    # every parameter may be a scalar or an array with one value per player,
+    # so a single batch can sweep a constant over its whole range.
+
+    __slots__ = ('n', 'x', 'y', 'dx', 'dy', 'can_jump', 'params',
+                 'plat_left', 'plat_right', 'plat_top', 'wall_x')
+
+    def __init__(self, n, platforms, walls, start_x=0, start_y=PLAYER_START_Y, **params):
+        unknown = set(params) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown physics parameters: {sorted(unknown)}")
+
+        self.n = n
+        self.x = np.full(n, start_x, dtype=np.float64)
+        self.y = np.full(n, start_y, dtype=np.float64)
+        self.dx = np.zeros(n)
+        self.dy = np.zeros(n)
+        self.can_jump = np.ones(n, dtype=bool)
+
+        self.params = dict(DEFAULT_PARAMS)
+        for name, value in params.items():
+            self.params[name] = np.broadcast_to(np.asarray(value, dtype=np.float64), (n,)) \
+                if np.ndim(value) else value
+
+        self.set_platforms(platforms)
+        self.wall_x = [wall.x for wall in walls]
+
+    def set_platforms(self, platforms):
+        # cache platform bounds as row vectors for the n x platforms landing test
+        plat_x = np.array([plat.x for plat in platforms], dtype=np.float64)
+        half_length = np.array([plat.length * 10 for plat in platforms], dtype=np.float64)
+        self.plat_left = plat_x - half_length - PLAYER_COLLISION_TOLERANCE
+        self.plat_right = plat_x + half_length + PLAYER_COLLISION_TOLERANCE
+        self.plat_top = np.array([plat.y for plat in platforms], dtype=np.float64) + PLAT_HALF_SIZE
+
+    def step(self, left, right, space):
+        # advance every player by one frame; inputs are boolean arrays of length n
+        p = self.params
+        acceleration = p["ACCELERATION"]
+        turn_acceleration = acceleration * p["TURN_FACTOR"]
+        max_speed = p["MAX_SPEED"]
+        bounce = p["WALL_BOUNCE_FACTOR"]
+
+        dx = self.dx.copy()
+        dx = np.where(right, dx + np.where(dx < 0, turn_acceleration, acceleration), dx)
+        dx = np.where(left, dx - np.where(dx > 0, turn_acceleration, acceleration), dx)
+
+        jump = space & self.can_jump
+        dy = np.where(jump, p["JUMP_DISTANCE"] + np.abs(dx) * p["JUMP_FACTOR"], self.dy)
+        airborne = jump | ~self.can_jump
+
+        # gravity and friction
+        dy = np.where(airborne, dy - p["GRAVITY"], dy)
+        dx = np.where(airborne, dx * p["AIR_FRICTION"],
+                      np.where(left | right, dx, dx * p["FRICTION"]))
+
+        # speed limits
+        dx = np.minimum(max_speed, np.maximum(-max_speed, dx))
+
+        x = self.x
+        y = self.y
+        next_x = x + dx
+        for wall_x in self.wall_x:
+            hit_right = (next_x + PLAYER_HALF_SIZE > wall_x - WALL_HALF_SIZE) & (x < wall_x)
+            hit_left = ~hit_right & (next_x - PLAYER_HALF_SIZE < wall_x + WALL_HALF_SIZE) & (x > wall_x)
+            hit = hit_right | hit_left
+            bounced = np.abs(dx) * bounce
+            dx = np.where(hit_right, -bounced, np.where(hit_left, bounced, dx))
+            dy = np.where(hit, dy + np.abs(dx) * bounce, dy)
+
+        # platform landing, one row per player
+        falling = dy <= 0
+        tolerance = np.maximum(1, -dy)[:, None]
+        bottom = (y - PLAYER_HALF_SIZE)[:, None]
+        xs = x[:, None]
+        on_platform = ((self.plat_left <= xs) & (xs <= self.plat_right) &
+                       (np.abs(bottom - self.plat_top) <= tolerance)).any(axis=1)
+        landed = falling & on_platform
+        dy = np.where(landed, 0, dy)
+        self.can_jump = landed
+
+        dx = np.where(np.abs(dx) < 0.1, 0, dx)
+
+        self.x = x + dx
+        self.y = y + dy
+        self.dx = dx
+        self.dy = dy
+
+    def state(self, i):
+        # player i as a world.PlayerState (without progression fields)
+        player = PlayerState(float(self.x[i]), float(self.y[i]))
+        player.dx = float(self.dx[i])
+        player.dy = float(self.dy[i])
+        player.can_jump = bool(self.can_jump[i])
+        return player
+
+
+def compare_with_scalar(n=256, frames=600, seed=0, tolerance=0.0):
+    # run random inputs through BatchPlayers and step_player, return the largest difference;
+    # raises AssertionError when it exceeds tolerance (both do the same float operations)
+    world = World(seed)
+    rng = random.Random(seed)
+    batch = BatchPlayers(n, world.platforms, world.walls)
+    players = [PlayerState(0, PLAYER_START_Y) for _ in range(n)]
+    events = []
+    worst = 0.0
+
+    for _ in range(frames):
+        left = np.array([rng.random() < 0.3 for _ in range(n)])
+        right = np.array([rng.random() < 0.4 for _ in range(n)])
+        space = np.array([rng.random() < 0.2 for _ in range(n)])
+        batch.step(left, right, space)
+
+        for i, player in enumerate(players):
+            step_player(player, Inputs(left[i], right[i], space[i]), world.platforms, world.walls, events)
+            if player.can_jump != batch.can_jump[i]:
+                raise AssertionError(f"can_jump differs for player {i}")
+            worst = max(worst, abs(player.x - batch.x[i]), abs(player.y - batch.y[i]),
+                        abs(player.dx - batch.dx[i]), abs(player.dy - batch.dy[i]))
+        events.clear()
+
+    if worst > tolerance:
+        raise AssertionError(f"batch and scalar players differ by {worst} (tolerance {tolerance})")
+    return worst
+
+
+if __name__ == "__main__":
+    print(f"Batch players match step_player: largest difference {compare_with_scalar()}")
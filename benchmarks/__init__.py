@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# per-stage timings of World.step on canned world states, see python -m benchmarks -h
+from benchmarks.stages import run_benchmarks, compare_results, confirm_regressions, load_results, save_results
@@ -0,0 +1,65 @@
+# benchmarks/__main__.py
+import argparse
+import sys
+from benchmarks.stages import (FRAMES, MIN_SLOWDOWN_US, REPEAT, THRESHOLD, compare_results,
+                               confirm_regressions, format_results, load_results, run_benchmarks,
+                               save_results)
+from benchmarks.memory import ENTITIES, format_memory_results, run_memory_report
+from benchmarks.render import SPRITES, format_render_results, run_render_benchmarks
+from render_backends import BACKENDS
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Time every game_loop stage on canned world states")
+    parser.add_argument("command", choices=["run", "save", "compare", "render", "memory"],
+                        help="run: print timings, save: store them as baseline, "
+                             "compare: flag stages slower than the baseline, "
+                             "render: frame time of every render backend, "
+                             "memory: bytes per entity of the world and every render backend")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--frames", type=int, default=FRAMES)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="relative slowdown reported as regression")
+    parser.add_argument("--min-slowdown", type=float, default=MIN_SLOWDOWN_US,
+                        help="microseconds a stage must also slow down by to count as regression")
+    parser.add_argument("--renderers", nargs="+", choices=list(BACKENDS), default=list(BACKENDS),
+                        help="backends used by render and memory (turtle and canvas need a display)")
+    parser.add_argument("--sprites", type=int, default=SPRITES, help="sprites moved by the render command")
+    parser.add_argument("--entities", type=int, default=ENTITIES, help="objects of each type the memory command creates")
+    args = parser.parse_args()
+
+    if args.command == "memory":
+        print(format_memory_results(run_memory_report(args.renderers, args.entities), args.entities))
+        return 0
+    if args.command == "render":
+        print(format_render_results(run_render_benchmarks(args.renderers, args.sprites), args.sprites))
+        return 0
+
+    results = run_benchmarks(args.frames, args.repeat)
+    print(format_results(results))
+
+    if args.command == "save":
+        save_results(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.command == "compare":
+        baseline = load_results(args.baseline)
+        regressions = compare_results(results, baseline, args.threshold, args.min_slowdown)
+        if regressions:
+            # a stage only counts when a second run of its scenario is slow too
+            print(f"{len(regressions)} stages look slower, timing their scenarios again")
+            regressions = confirm_regressions(regressions, baseline, args.frames, args.repeat,
+                                              threshold=args.threshold, min_slowdown=args.min_slowdown)
+        for scenario, stage, base, current in regressions:
+            print(f"REGRESSION {scenario}/{stage}: {base:.2f} us -> {current:.2f} us")
+        if regressions:
+            return 1
+        print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
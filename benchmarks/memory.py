@@ -0,0 +1,78 @@
+# benchmarks/memory.py
+import gc
+import tracemalloc
+from particles import StarEmitter
+from render_backends import BACKENDS, create_backend
+from renderer import Bonus, Platform, StarField
+from tower import PlatformState
+from world import BonusState
+
+# Python heap bytes per entity, world records and sprites of each render
+# backend; Tk's own canvas items are not counted. turtle and canvas need a display
+
+ENTITIES = 500
+
+
+def bytes_per_object(factory, count=ENTITIES):
+    # mean traced allocation of count objects kept alive together
+    objects = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(count):
+            objects.append(factory())
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / count
+
+
+def star_record_bytes():
+    # a star is one slot in each of the emitter's parallel arrays
+    emitter = StarEmitter()
+    arrays = (emitter.x, emitter.y, emitter.dy, emitter.angle, emitter.color)
+    return sum(values.itemsize for values in arrays)
+
+
+def world_entities():
+    return {
+        "platform state": lambda: PlatformState(0, 0, 8),
+        "bonus state": lambda: BonusState(0, 0),
+    }
+
+
+def scene_entities(backend):
+    return {
+        "platform": lambda: Platform(backend, 0, 0, 8),
+        "bonus": lambda: Bonus(backend),
+        "star sprite": lambda: backend.sprite(StarField.STAR_SHAPE, StarField.STAR_SIZE),
+    }
+
+
+def run_memory_report(names=tuple(BACKENDS), count=ENTITIES):
+    # {group: {entity: bytes}}, group is "world" or a backend name
+    results = {"world": {name: bytes_per_object(factory, count)
+                         for name, factory in world_entities().items()}}
+    results["world"]["star (emitter slot)"] = star_record_bytes()
+
+    screen = None
+    if any(name != "null" for name in names):
+        from main import init_screen, register_assets
+        screen = init_screen()
+        register_assets(screen)
+
+    for name in names:
+        backend = create_backend(name, screen)
+        results[name] = {entity: bytes_per_object(factory, count)
+                         for entity, factory in scene_entities(backend).items()}
+    return results
+
+
+def format_memory_results(results, count=ENTITIES):
+    lines = [f"Bytes per entity ({count} of each alive)"]
+    for group, entities in results.items():
+        lines.append(f"  {group}")
+        for name, size in entities.items():
+            lines.append(f"    {name:<22}{size:>9.0f}")
+    return "\n".join(lines)
@@ -0,0 +1,67 @@
+# benchmarks/render.py
+import math
+import time
+from render_backends import BACKENDS, create_backend
+
+# frame time of each render backend with a few hundred moving sprites;
+# turtle and canvas need a display, null runs anywhere
+
+SPRITES = 300
+RENDER_FRAMES = 300
+SPRITE_SHAPES = ("plat.gif", "turtle")  # image and polygon sprites alternate
+
+
+def time_backend(backend, sprites=SPRITES, frames=RENDER_FRAMES):
+    # mean milliseconds per frame: every sprite moves and turns, then one flush
+    handles = []
+    for i in range(sprites):
+        sprite = backend.sprite(SPRITE_SHAPES[i % len(SPRITE_SHAPES)], 0.5)
+        sprite.set_visible(True)
+        handles.append(sprite)
+    score = backend.text(-390, 440, "white", ("Courier", 32, "bold"))
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        for i, sprite in enumerate(handles):
+            angle = (frame * 3 + i * 7) % 360
+            sprite.move_to(300 * math.cos(math.radians(i + frame)), 400 * math.sin(math.radians(i * 3)))
+            sprite.turn_to(angle)
+        score.write_text(f"Punkty: {frame // 30 * 100}")
+        backend.flush()
+    elapsed = time.perf_counter() - start
+
+    for sprite in handles:
+        sprite.set_visible(False)
+    backend.flush()
+    return elapsed / frames * 1000
+
+
+def run_render_benchmarks(names=tuple(BACKENDS), sprites=SPRITES, frames=RENDER_FRAMES):
+    # {backend: {"frame_ms": ..., "ops_per_frame": ...}}, one shared turtle screen
+    screen = None
+    if any(name != "null" for name in names):
+        from main import init_screen, register_assets
+        screen = init_screen()
+        register_assets(screen)
+
+    results = {}
+    for name in names:
+        backend = create_backend(name, screen)
+        frame_ms = time_backend(backend, sprites, frames)
+        results[name] = {"frame_ms": frame_ms, "ops_per_frame": backend.stats.summary()["ops_mean"]}
+        if name != "null":
+            # the next backend starts on an empty canvas; clear() also turns tracing back on
+            screen.clear()
+            screen.tracer(0)
+    return results
+
+
+def format_render_results(results, sprites=SPRITES):
+    lines = [f"{sprites} sprites"]
+    for name, result in results.items():
+        lines.append(f"  {name:<8}{result['frame_ms']:>9.2f} ms/frame  "
+                     f"({result['ops_per_frame']:.0f} canvas ops)")
+    if "turtle" in results and "canvas" in results:
+        speedup = results["turtle"]["frame_ms"] / results["canvas"]["frame_ms"]
+        lines.append(f"  canvas is {speedup:.1f}x as fast as turtle")
+    return "\n".join(lines)
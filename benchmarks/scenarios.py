@@ -0,0 +1,87 @@
+# benchmarks/scenarios.py
+import random
+from constants import FAST_SCROLL_Y, HALF_PLAT_SIZE, MAX_SCROLL_SPEED
+from bot import record_session
+from world import Inputs, World
+
+# canned world states; setup() builds the world, before_frame() keeps it in shape
+# between frames and runs outside the timed stages
+
+
+class Scenario:
+    # climbing with seeded random inputs on a fresh tower
+
+    name = "fresh_tower"
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.inputs = Inputs()
+
+    def setup(self):
+        return World(self.seed)
+
+    def before_frame(self, world):
+        inputs = self.inputs
+        inputs.left = self.rng.random() < 0.3
+        inputs.right = self.rng.random() < 0.5
+        inputs.space = self.rng.random() < 0.4
+        return inputs
+
+
+class LongSession(Scenario):
+    # many leftover stars and bonuses, as after a long play session
+
+    name = "long_session"
+    BONUS_COUNT = 40
+
+    def before_frame(self, world):
+        # top up stars and bonuses that fell off or were collected
+        stars = world.stars
+        while stars.count < stars.capacity:
+            stars.emit(self.rng.uniform(-300, 300), world.camera.top,
+                       self.rng.randint(0, 360), self.rng.randrange(8))
+        platforms = list(world.platforms)
+        while len(world.bonuses) < self.BONUS_COUNT:
+            plat = self.rng.choice(platforms)
+            world.add_bonus(plat.x, plat.y + HALF_PLAT_SIZE + 20)
+        return Scenario.before_frame(self, world)
+
+
+class MaxScroll(Scenario):
+    # player kept high on screen so the tower scrolls at full speed
+
+    name = "max_scroll"
+
+    def setup(self):
+        world = World(self.seed)
+        world.player.scroll_active = True
+        world.player.scroll_speed = MAX_SCROLL_SPEED
+        return world
+
+    def before_frame(self, world):
+        player = world.player
+        player.y = world.camera.y + FAST_SCROLL_Y + 10
+        player.dy = 0
+        return Scenario.before_frame(self, world)
+
+
+class BotClimb(Scenario):
+    # a real climb: inputs of a beam search bot game, recorded once and replayed
+
+    name = "bot_climb"
+    FRAMES = 2000
+    _log = None  # shared by every repeat
+
+    def setup(self):
+        if BotClimb._log is None:
+            BotClimb._log = record_session(self.FRAMES, self.seed)
+        return World(self.seed)
+
+    def before_frame(self, world):
+        if world.frame < len(self._log):
+            return self._log.inputs_at(world.frame, self.inputs)
+        return Scenario.before_frame(self, world)
+
+
+SCENARIOS = [Scenario, LongSession, MaxScroll, BotClimb]
@@ -0,0 +1,148 @@
+# benchmarks/stages.py
+import gc
+import json
+import platform
+import statistics
+import time
+from world import World
+from benchmarks.scenarios import SCENARIOS
+
+FRAMES = 2000
+REPEAT = 7
+THRESHOLD = 0.15  # relative slowdown that counts as a regression
+MIN_SLOWDOWN_US = 0.5  # and absolute; stages take a few us, smaller changes are noise
+REFERENCE_LOOPS = 20000
+
+
+def reference_workload(loops=REFERENCE_LOOPS):
+    # fixed float and attribute work that never changes with the game code;
+    # its time tracks how fast the machine runs at the moment
+    class Body:
+        __slots__ = ('y', 'dy')
+
+    body = Body()
+    body.y = body.dy = 0.0
+    for i in range(loops):
+        body.dy = body.dy * 0.9 - 1.0
+        body.y += body.dy
+        if body.y < -100.0:
+            body.y = float(i & 255)
+    return body.y
+
+
+def time_reference():
+    # nanoseconds of one reference_workload run
+    start = time.perf_counter_ns()
+    reference_workload()
+    return time.perf_counter_ns() - start
+
+
+def time_stages(scenario, frames=FRAMES):
+    # mean nanoseconds per call of every World stage over frames steps
+    world = scenario.setup()
+    stages = [getattr(world, name) for name in World.STAGES]
+    totals = [0] * len(stages)
+    clock = time.perf_counter_ns
+
+    for _ in range(frames):
+        if world.game_over:
+            world = scenario.setup()
+            stages = [getattr(world, name) for name in World.STAGES]
+        world.begin_step(scenario.before_frame(world))
+        for i, stage in enumerate(stages):
+            start = clock()
+            stage()
+            totals[i] += clock() - start
+        world.end_step()
+
+    return {name: total / frames for name, total in zip(World.STAGES, totals)}
+
+
+def run_benchmarks(frames=FRAMES, repeat=REPEAT, seed=0, scenarios=SCENARIOS):
+    # per-stage timings in microseconds for every scenario, compared by their median
+    #
+    # scenarios take turns, one run each per round, so a slow spell of the
+    # machine hits all of them alike; the collector is off while timing
+    runs = {scenario_class.name: [] for scenario_class in scenarios}
+    references = []
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for scenario_class in scenarios:
+                references.append(time_reference())
+                runs[scenario_class.name].append(time_stages(scenario_class(seed), frames))
+    finally:
+        if collecting:
+            gc.enable()
+    results = {
+        name: {
+            stage: {
+                "min_us": min(run[stage] for run in stage_runs) / 1000,
+                "median_us": statistics.median(run[stage] for run in stage_runs) / 1000,
+            }
+            for stage in World.STAGES
+        }
+        for name, stage_runs in runs.items()
+    }
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "frames": frames,
+        "repeat": repeat,
+        "reference_us": statistics.median(references) / 1000,
+        "scenarios": results,
+    }
+
+
+def compare_results(current, baseline, threshold=THRESHOLD, min_slowdown=MIN_SLOWDOWN_US):
+    # (scenario, stage, baseline_us, current_us) for every stage whose median got
+    # slower by more than threshold and by more than min_slowdown microseconds;
+    # baseline timings are first scaled by how much slower the reference workload ran
+    scale = 1.0
+    if "reference_us" in current and "reference_us" in baseline:
+        scale = current["reference_us"] / baseline["reference_us"]
+    regressions = []
+    for scenario, stages in current["scenarios"].items():
+        base_stages = baseline["scenarios"].get(scenario, {})
+        for stage, timing in stages.items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            before, after = base["median_us"] * scale, timing["median_us"]
+            if after > before * (1 + threshold) and after - before > min_slowdown:
+                regressions.append((scenario, stage, before, after))
+    return regressions
+
+
+def confirm_regressions(regressions, baseline, frames=FRAMES, repeat=REPEAT, seed=0,
+                        threshold=THRESHOLD, min_slowdown=MIN_SLOWDOWN_US):
+    # time the flagged scenarios again and keep the stages that are slower both times
+    if not regressions:
+        return []
+    flagged = {scenario for scenario, *_ in regressions}
+    rerun = run_benchmarks(frames, repeat, seed,
+                           [scenario_class for scenario_class in SCENARIOS if scenario_class.name in flagged])
+    again = {(scenario, stage): current for scenario, stage, _, current in
+             compare_results(rerun, baseline, threshold, min_slowdown)}
+    return [(scenario, stage, base, min(current, again[scenario, stage]))
+            for scenario, stage, base, current in regressions if (scenario, stage) in again]
+
+
+def save_results(results, path):
+    with open(path, "w") as output:
+        json.dump(results, output, indent=2)
+
+
+def load_results(path):
+    with open(path) as baseline:
+        return json.load(baseline)
+
+
+def format_results(results):
+    lines = [f"reference workload {results['reference_us']:.0f} us"] if "reference_us" in results else []
+    for scenario, stages in results["scenarios"].items():
+        lines.append(scenario)
+        for stage, timing in stages.items():
+            lines.append(f"  {stage:<24}{timing['median_us']:>9.2f} us  (min {timing['min_us']:.2f})")
+    return "\n".join(lines)
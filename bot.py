@@ -0,0 +1,266 @@
+# bot.py
+import argparse
+import struct
+import time
+from constants import (FAST_SCROLL_SPEED, FAST_SCROLL_Y, HALF_PLAYER_SIZE, PLAT_HALF_SIZE,
+                       PLAYER_HALF_SIZE, SCROLL_THRESHOLD)
+from replay import InputLog
+from world import Inputs, PlayerState, World, step_player
+
+# autoplay: beam search over step_player, usable as an input source anywhere
+# a Recorder or Replayer is
+
+# (left, right, space) combinations the search tries
+ACTIONS = (
+    (False, False, False), (False, False, True),
+    (True, False, False), (True, False, True),
+    (False, True, False), (False, True, True),
+)
+
+BEAM_WIDTH = 6
+DEPTH = 4  # macro steps searched ahead
+MACRO_FRAMES = 15  # frames an action is held within one macro step
+FRAME_BUDGET = 0.004  # seconds of planning per frame, None searches to full depth
+MAX_CACHE = 200000  # cached transitions before the cache starts over
+DEAD = float("-inf")
+# cache entries are packed into bytes: a dict holding only bytes is not tracked
+# by the garbage collector, which would otherwise walk every cached transition
+# on each full collection, several ms on a large cache
+CACHE_KEY = struct.Struct("<4d?3?B")  # x, y, dx, dy, can_jump, left, right, space, frames
+CACHE_VALUE = struct.Struct("<4d?d")  # x, y, dx, dy, can_jump, highest landing
+
+
+class BotStats:
+    # planning cost and cache behaviour of a BeamBot
+
+    __slots__ = ('frames', 'plan_time', 'max_plan_time', 'over_budget', 'hits', 'misses')
+
+    def __init__(self):
+        self.frames = 0
+        self.plan_time = 0.0
+        self.max_plan_time = 0.0
+        self.over_budget = 0  # frames where the search stopped before full depth
+        self.hits = 0
+        self.misses = 0
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        return {
+            "frames": self.frames,
+            "mean_ms": self.plan_time / self.frames * 1000 if self.frames else 0.0,
+            "max_ms": self.max_plan_time * 1000,
+            "over_budget": self.over_budget,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class BeamBot:
+    # plans left/right/space for world every frame
+    #
+    # actions are held for MACRO_FRAMES frames, with macro steps aligned to
+    # absolute frame numbers, so the next frame's search mostly revisits
+    # states the cache already holds. when the budget runs out the deepest
+    # finished level decides.
+
+    def __init__(self, world, beam_width=BEAM_WIDTH, depth=DEPTH, macro_frames=MACRO_FRAMES,
+                 budget=FRAME_BUDGET, clock=time.perf_counter):
+        self.world = world
+        self.beam_width = beam_width
+        self.depth = depth
+        self.macro_frames = macro_frames
+        self.budget = budget
+        self.clock = clock
+        self.inputs = Inputs()
+        self.cache = {}  # packed (state, action, frames) -> packed (state, highest landing)
+        self.stats = BotStats()
+        self._sim = PlayerState(0, 0)
+        self._sim_inputs = Inputs()
+        self._events = []
+        self._last_frame = -1
+
+    def next(self):
+        # input source interface: the planned inputs of the current frame
+        start = self.clock()
+        world = self.world
+        # a restarted world has a new layout, which invalidates every cached transition
+        if world.frame <= self._last_frame or len(self.cache) > MAX_CACHE:
+            self.cache.clear()
+        self._last_frame = world.frame
+
+        left, right, space = self.plan(start)
+        inputs = self.inputs
+        inputs.left = left
+        inputs.right = right
+        inputs.space = space
+
+        elapsed = self.clock() - start
+        stats = self.stats
+        stats.frames += 1
+        stats.plan_time += elapsed
+        if elapsed > stats.max_plan_time:
+            stats.max_plan_time = elapsed
+        return inputs
+
+    def simulate(self, state, action, frames):
+        # state after holding action for frames, and the highest feet y it stood at
+        key = CACHE_KEY.pack(*state, *action, frames)
+        result = self.cache.get(key)
+        if result is not None:
+            self.stats.hits += 1
+            x, y, dx, dy, can_jump, landed = CACHE_VALUE.unpack(result)
+            return (x, y, dx, dy, can_jump), landed
+        self.stats.misses += 1
+
+        sim = self._sim
+        sim.x, sim.y, sim.dx, sim.dy, sim.can_jump = state
+        inputs = self._sim_inputs
+        inputs.left, inputs.right, inputs.space = action
+        platforms = self.world.platforms
+        walls = self.world.walls
+        events = self._events
+        landed = DEAD
+        for _ in range(frames):
+            step_player(sim, inputs, platforms, walls, events)
+            if sim.can_jump and sim.y > landed:
+                landed = sim.y
+        events.clear()
+
+        state = (sim.x, sim.y, sim.dx, sim.dy, sim.can_jump)
+        self.cache[key] = CACHE_VALUE.pack(*state, landed)
+        return state, landed
+
+    def evaluate(self, state, landed, bottom):
+        # the floor a path ends on counts first, then closeness to the floor
+        # above it, then height; a path that fell below its best landing is
+        # only worth the floor under it now
+        x, y = state[0], state[1]
+        if y + HALF_PLAYER_SIZE < bottom:
+            return DEAD
+        level = y if state[4] else min(landed, self.standing_y(y))
+        platforms = self.world.platforms
+        target = platforms.get(platforms.highest_floor_below(level - PLAYER_HALF_SIZE) + 1)
+        distance = abs(x - target.x) if target is not None else 0.0
+        return level + 0.1 * y - 0.2 * distance
+
+    def standing_y(self, y):
+        # player y when standing on the highest platform below y
+        platforms = self.world.platforms
+        floor = platforms.highest_floor_below(y - PLAYER_HALF_SIZE)
+        if floor < 0:
+            return self.world.camera.bottom
+        return platforms.get(floor).y + PLAT_HALF_SIZE + PLAYER_HALF_SIZE
+
+    def camera_speed(self):
+        # scroll per frame assumed for the whole horizon
+        player = self.world.player
+        camera = self.world.camera
+        screen_y = camera.to_screen(player.y)
+        if not player.scroll_active and screen_y <= SCROLL_THRESHOLD:
+            return 0
+        return FAST_SCROLL_SPEED if screen_y > FAST_SCROLL_Y else player.scroll_speed
+
+    def expand(self, beam, frames, bottom, deadline=None):
+        # best entry per state reached by every action from every beam entry;
+        # None when the clock passes deadline before all of them are simulated
+        clock = self.clock
+        candidates = {}
+        for _, state, landed, first in beam:
+            for action in ACTIONS:
+                if deadline is not None and clock() > deadline:
+                    return None
+                next_state, next_landed = self.simulate(state, action, frames)
+                next_landed = max(landed, next_landed)
+                value = self.evaluate(next_state, next_landed, bottom)
+                if value == DEAD:
+                    continue
+                # identical states keep only their best scoring path
+                previous = candidates.get(next_state)
+                if previous is None or value > previous[0]:
+                    candidates[next_state] = (value, next_state, next_landed,
+                                              first if first is not None else action)
+        return candidates
+
+    def plan(self, start):
+        world = self.world
+        player = world.player
+        root = (player.x, player.y, player.dx, player.dy, player.can_jump)
+        root_landed = player.y if player.can_jump else self.standing_y(player.y)
+        bottom = world.camera.bottom
+        speed = self.camera_speed()
+
+        # each beam entry: (value, state, highest landing, first action)
+        beam = [(0.0, root, root_landed, None)]
+        frame = world.frame
+        # the first level always finishes, deeper ones only before the deadline
+        deadline = None if self.budget is None else start + self.budget
+        best = None
+        for level in range(self.depth):
+            # the first macro step runs up to the next aligned frame
+            frames = self.macro_frames - (frame % self.macro_frames)
+            frame += frames
+            level_bottom = bottom + speed * (frame - world.frame)
+            candidates = self.expand(beam, frames, level_bottom, deadline if level else None)
+            if candidates is None:
+                # out of time: the unfinished level is dropped, the last finished one decides
+                self.stats.over_budget += 1
+                break
+            if not candidates:
+                break
+            beam = sorted(candidates.values(), key=lambda entry: entry[0], reverse=True)[:self.beam_width]
+            best = beam[0]
+
+        if best is None:
+            # every path dies, keep jumping towards the middle
+            return (player.x > 0, player.x < 0, True)
+        return best[3]
+
+
+def run_headless(frames, seed=0, log=None, **options):
+    # let the bot play one game and return the world and the bot;
+    # the inputs are appended to log when one is given
+    world = World(seed)
+    bot = BeamBot(world, **options)
+    while world.frame < frames and not world.game_over:
+        inputs = bot.next()
+        if log is not None:
+            log.record(inputs)
+        world.step(inputs)
+    return world, bot
+
+
+def record_session(frames, seed=0, **options):
+    # input log of a bot game; without a time budget the search, and so the log, is reproducible
+    options.setdefault("budget", None)
+    log = InputLog(seed)
+    run_headless(frames, seed, log, **options)
+    return log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Let the beam search bot play headless")
+    parser.add_argument("--frames", type=int, default=36000, help="frames to play (default: 10 minutes)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--beam", type=int, default=BEAM_WIDTH)
+    parser.add_argument("--depth", type=int, default=DEPTH)
+    parser.add_argument("--budget-ms", type=float, default=FRAME_BUDGET * 1000,
+                        help="planning time per frame, 0 for none")
+    parser.add_argument("--save", metavar="FILE", help="record the game as a replay file")
+    args = parser.parse_args()
+
+    log = InputLog(args.seed) if args.save else None
+    start = time.perf_counter()
+    world, bot = run_headless(args.frames, args.seed, log, beam_width=args.beam, depth=args.depth,
+                              budget=args.budget_ms / 1000 or None)
+    elapsed = time.perf_counter() - start
+    stats = bot.stats.summary()
+    print(f"Frames: {world.frame}, floor: {world.player.highest_floor}, score: {world.score}, "
+          f"game over: {world.game_over}, {world.frame / elapsed:.0f} frames/s")
+    print("Planning: {mean_ms:.3f} ms mean, {max_ms:.3f} ms max, {over_budget} frames over budget, "
+          "cache hit rate {hit_rate:.0%}".format(**stats))
+    if log is not None:
+        log.save(args.save)
+        print(f"Session recorded to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# camera.py
+from constants import HALF_SCREEN_HEIGHT
+
+
+class Camera:
+    # vertical view offset; world coordinates never move, only the camera does
+
+    __slots__ = ('y',)
+
+    def __init__(self, y=0):
+        self.y = y  # world y shown at the centre of the screen
+
+    @property
+    def bottom(self):
+        return self.y - HALF_SCREEN_HEIGHT
+
+    @property
+    def top(self):
+        return self.y + HALF_SCREEN_HEIGHT
+
+    def scroll(self, speed):
+        self.y += speed
+
+    def to_screen(self, y):
+        return y - self.y
@@ -25,7 +25,10 @@ HALF_SCREEN_WIDTH = SCREEN_WIDTH // 2
 HALF_PLAYER_SIZE = PLAYER_PIXEL_SIZE // 2
 HALF_PLAT_SIZE = PLAT_PIXEL_SIZE // 2
 PLATFORM_GAP = PLAYER_PIXEL_SIZE + PLAT_PIXEL_SIZE + SCREEN_MARGIN
-FRAME_TIME = 1000 // 60  # 60 FPS
+PHYSICS_HZ = 60
+FIXED_TIMESTEP = 1 / PHYSICS_HZ  # seconds per physics step
+MAX_CATCHUP_STEPS = 5  # physics steps per tick before a render is skipped
+MAX_BACKLOG = 0.25  # seconds of missed physics steps kept for catching up
 
 GRAVITY = 1
 FRICTION = 0.9
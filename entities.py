@@ -0,0 +1,200 @@
+# entities.py
+import sys
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # the same passes run as plain loops over array columns
+    np = None
+
+# struct-of-arrays entity storage
+#
+# every field is one contiguous column, live entities occupy rows
+# [0, count). columns are numpy arrays when numpy is installed and
+# array.array otherwise; the per-frame passes below are one numpy
+# expression per column or one loop, so their cost does not depend on
+# Python objects per entity. a removed row is filled with the last live row.
+
+MIN_CAPACITY = 16
+VECTOR_MIN_ROWS = 32  # below this the numpy call overhead outweighs a plain loop
+NUMPY_TYPES = {'d': 'float64', 'B': 'uint8', 'l': 'int64'}
+
+
+class EntityStore:
+    # columns are attributes named after their field, e.g. store.x
+    #
+    # with items=True a Python object per row (e.g. a world.BonusState for
+    # the presentation layer) is kept in the items list and moves with its row
+
+    def __init__(self, columns, capacity=MIN_CAPACITY, items=False, vectorized=None):
+        # columns: ((name, typecode), ...) with array typecodes 'd', 'B' or 'l'
+        if vectorized is None:
+            vectorized = np is not None
+        elif vectorized and np is None:
+            raise ImportError("numpy is not installed")
+        self.vectorized = vectorized
+        self.fields = columns
+        self.names = tuple(name for name, _ in columns)
+        self.count = 0
+        self.capacity = capacity
+        self.items = [] if items else None
+        for name, typecode in columns:
+            setattr(self, name, self._allocate(typecode, capacity))
+
+    def _allocate(self, typecode, size):
+        if self.vectorized:
+            return np.zeros(size, dtype=NUMPY_TYPES[typecode])
+        return array(typecode, bytes(array(typecode).itemsize * size))
+
+    def _grow(self):
+        # double every column; rows keep their index
+        capacity = self.capacity
+        for name, typecode in self.fields:
+            column = getattr(self, name)
+            if self.vectorized:
+                setattr(self, name, np.concatenate((column, self._allocate(typecode, capacity))))
+            else:
+                column.extend(self._allocate(typecode, capacity))
+        self.capacity = capacity * 2
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # the row objects; only for stores with items
+        return iter(self.items)
+
+    def __getitem__(self, row):
+        return self.items[row]
+
+    def clear(self):
+        self.count = 0
+        if self.items is not None:
+            self.items.clear()
+
+    def add(self, *values, item=None):
+        # append a row with one value per column, return its index
+        row = self.count
+        if row == self.capacity:
+            self._grow()
+        for name, value in zip(self.names, values):
+            getattr(self, name)[row] = value
+        if self.items is not None:
+            self.items.append(item)
+        self.count = row + 1
+        return row
+
+    def remove(self, row):
+        # swap the last live row into row; returns the removed row's item
+        last = self.count - 1
+        if row != last:
+            for name in self.names:
+                column = getattr(self, name)
+                column[row] = column[last]
+        self.count = last
+        items = self.items
+        if items is None:
+            return None
+        item = items[row]
+        items[row] = items[last]
+        items.pop()
+        return item
+
+    def remove_rows(self, rows, removed=None):
+        # remove rows given in ascending order, appending their items to removed;
+        # going from the highest row down, a row swapped in is never one still to remove
+        for row in reversed(rows):
+            item = self.remove(row)
+            if removed is not None:
+                removed.append(item)
+
+    # per-frame passes; each returns or updates every live row at once
+
+    def rows_below(self, name, limit):
+        # ascending rows whose column value is below limit
+        count = self.count
+        column = getattr(self, name)
+        if self.vectorized:
+            if count >= VECTOR_MIN_ROWS:
+                return np.flatnonzero(column[:count] < limit).tolist()
+            column = column[:count].tolist()
+        return [row for row in range(count) if column[row] < limit]
+
+    def rows_within(self, x, y, radius):
+        # ascending rows whose (x, y) lies closer than radius to the point
+        count = self.count
+        xs, ys = self.x, self.y
+        radius_sq = radius * radius
+        if self.vectorized:
+            if count >= VECTOR_MIN_ROWS:
+                ddx = xs[:count] - x
+                ddy = ys[:count] - y
+                return np.flatnonzero(ddx * ddx + ddy * ddy < radius_sq).tolist()
+            xs, ys = xs[:count].tolist(), ys[:count].tolist()
+        rows = []
+        for row in range(count):
+            ddx = xs[row] - x
+            ddy = ys[row] - y
+            if ddx * ddx + ddy * ddy < radius_sq:
+                rows.append(row)
+        return rows
+
+    def any_near(self, x, y, half_width, half_height):
+        # whether any row lies inside the box around (x, y)
+        count = self.count
+        xs, ys = self.x, self.y
+        if self.vectorized:
+            if count >= VECTOR_MIN_ROWS:
+                return bool(np.any((np.abs(xs[:count] - x) < half_width) &
+                                   (np.abs(ys[:count] - y) < half_height)))
+            xs, ys = xs[:count].tolist(), ys[:count].tolist()
+        for row in range(count):
+            if abs(xs[row] - x) < half_width and abs(ys[row] - y) < half_height:
+                return True
+        return False
+
+    def fall(self, gravity):
+        # dy -= gravity, then y += dy
+        count = self.count
+        ys, dys = self.y, self.dy
+        if self.vectorized:
+            dys[:count] -= gravity
+            ys[:count] += dys[:count]
+            return
+        for row in range(count):
+            speed = dys[row] - gravity
+            dys[row] = speed
+            ys[row] += speed
+
+    def offset(self, name, amount):
+        # add amount to one column of every row
+        count = self.count
+        column = getattr(self, name)
+        if self.vectorized:
+            column[:count] += amount
+            return
+        for row in range(count):
+            column[row] += amount
+
+
+if __name__ == "__main__":
+    # cost of one frame of falling, culling and pickup checks per entity count
+    counts = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000, 10000]
+    modes = (False, True) if np is not None else (False,)
+    columns = (("x", 'd'), ("y", 'd'), ("dy", 'd'))
+    frames = 200
+    for vectorized in modes:
+        print("numpy columns" if vectorized else "array columns")
+        for count in counts:
+            store = EntityStore(columns, vectorized=vectorized)
+            for i in range(count):
+                store.add(i % 700 - 350, 1000 + i % 500, 0.0)
+            start = time.perf_counter()
+            for frame in range(frames):
+                store.fall(0.001)
+                store.offset("x", 0.0)
+                store.remove_rows(store.rows_below("y", -1e9))
+                store.rows_within(0, 0, 40)
+            elapsed = time.perf_counter() - start
+            print(f"  {count:>6} entities: {elapsed / frames * 1e6:9.1f} us/frame")
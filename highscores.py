@@ -0,0 +1,144 @@
+# highscores.py
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from bisect import bisect_right, insort
+
+# leaderboard: an append-only file of fixed-size records plus an in-memory
+# index of (score, record number) keys sorted by score
+
+MAGIC = b"STHS"
+VERSION = 1
+HEADER = struct.Struct("<4sB3x")  # magic, version, padding to 8 bytes
+RECORD = struct.Struct("<IIIIQ")  # score, floor, frames, unix time, seed
+RECORD_WORDS = RECORD.size // 4
+HIGHSCORE_FILE = "highscores.bin"
+RECORD_BITS = 32  # low bits of an index key hold the record number
+RECORD_MASK = (1 << RECORD_BITS) - 1
+
+
+class HighScoreStore:
+    # scores are only ever appended; ranks and top-K come from the index
+
+    def __init__(self, path=HIGHSCORE_FILE):
+        self.path = path
+        self.keys = array('Q')  # score << 32 | record number, ascending
+        self._file = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def open(self):
+        # create the file if needed and rebuild the index with one mapped scan
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, "a+b")
+        if new:
+            self._file.write(HEADER.pack(MAGIC, VERSION))
+            self._file.flush()
+        self.keys = self._scan()
+        return self
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _scan(self):
+        size = os.path.getsize(self.path)
+        with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{self.path} is not a StudentTower high-score file")
+            count = (size - HEADER.size) // RECORD.size
+            words = array('I', data[HEADER.size:HEADER.size + count * RECORD.size])
+        if size != HEADER.size + count * RECORD.size:
+            # drop a record cut short by a crash so appends stay aligned
+            self._file.truncate(HEADER.size + count * RECORD.size)
+        if sys.byteorder == "big":
+            words.byteswap()
+        scores = words[0::RECORD_WORDS]  # first field of every record
+        return array('Q', sorted((score << RECORD_BITS) | i for i, score in enumerate(scores)))
+
+    def record(self, score, floor, frames, seed=0, when=None):
+        # append one run and return its rank; O(log n) search plus one array insert
+        self._file.seek(0, os.SEEK_END)
+        number = (self._file.tell() - HEADER.size) // RECORD.size
+        when = int(time.time() if when is None else when)
+        self._file.write(RECORD.pack(score, floor, frames, when, seed))
+        self._file.flush()
+        insort(self.keys, (score << RECORD_BITS) | number)
+        return self.rank(score)
+
+    def rank(self, score):
+        # 1 + number of stored runs with a strictly higher score
+        return len(self.keys) - bisect_right(self.keys, (score << RECORD_BITS) | RECORD_MASK) + 1
+
+    def best(self):
+        return self.keys[-1] >> RECORD_BITS if self.keys else 0
+
+    def read(self, number):
+        # (score, floor, frames, time, seed) of a record
+        self._file.seek(HEADER.size + number * RECORD.size)
+        return RECORD.unpack(self._file.read(RECORD.size))
+
+    def top(self, k=10):
+        # best k runs, highest score first
+        if k <= 0:
+            return []
+        return [self.read(key & RECORD_MASK) for key in reversed(self.keys[-k:])]
+
+
+HIGHSCORES = HighScoreStore()
+
+
+def bench(runs):
+    # fill a temporary store with runs random scores and time the operations
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, HIGHSCORE_FILE)
+        with open(path, "wb") as output:
+            output.write(HEADER.pack(MAGIC, VERSION))
+            output.write(b"".join(RECORD.pack(rng.randrange(200000), 0, 0, 0, i) for i in range(runs)))
+        store = HighScoreStore(path)
+        start = time.perf_counter()
+        store.open()
+        loaded = time.perf_counter()
+        rank = store.record(123456, 1234, 5678, seed=1)
+        recorded = time.perf_counter()
+        top = store.top(10)
+        finished = time.perf_counter()
+        store.close()
+        print(f"{runs} runs: index rebuilt in {(loaded - start) * 1000:.0f} ms, "
+              f"record + rank {(recorded - loaded) * 1000:.2f} ms (rank {rank}), "
+              f"top 10 in {(finished - recorded) * 1000:.2f} ms")
+        assert [run[0] for run in top] == sorted((run[0] for run in top), reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StudentTower leaderboard")
+    parser.add_argument("file", nargs="?", default=HIGHSCORE_FILE)
+    parser.add_argument("--top", type=int, default=10, help="runs to list")
+    parser.add_argument("--rank", type=int, metavar="SCORE", help="rank a score would get")
+    parser.add_argument("--bench", type=int, metavar="RUNS", help="time the store with RUNS random runs")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench)
+        return
+    store = HighScoreStore(args.file).open()
+    if args.rank is not None:
+        print(f"Score {args.rank} would rank {store.rank(args.rank)} of {len(store) + 1}")
+    for place, (score, floor, frames, when, seed) in enumerate(store.top(args.top), 1):
+        print(f"{place:>3}. {score:>8}  floor {floor:>5}  {frames / 60:7.1f} s  "
+              f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(when))}  seed {seed}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# input_queue.py
+import time
+from array import array
+from profiler import StageTimes
+
+# keyboard events buffered between frames: the Tk callbacks only write a
+# timestamped key code into a ring, the game drains it once per step
+
+KEY_LEFT = 0
+KEY_RIGHT = 1
+KEY_SPACE = 2
+KEYS = {"Left": KEY_LEFT, "Right": KEY_RIGHT, "space": KEY_SPACE}  # Tk keysym -> key
+QUEUE_SIZE = 256  # power of two; when full the oldest events are overwritten
+
+
+class InputQueue:
+    # ring of (key << 1 | pressed, time) events plus the keys held after the last drain
+    #
+    # a key pressed and released again between two drains still counts as
+    # down for the step that drains it, so short taps are never lost
+
+    __slots__ = ('codes', 'times', 'mask', 'head', 'tail', 'held', 'dropped', 'latency', 'clock')
+
+    def __init__(self, size=QUEUE_SIZE, clock=time.perf_counter):
+        assert size & (size - 1) == 0, "queue size must be a power of two"
+        self.codes = array('B', bytes(size))
+        self.times = array('d', bytes(8 * size))
+        self.mask = size - 1
+        self.head = 0  # events ever pushed
+        self.tail = 0  # events ever drained or dropped
+        self.held = [False] * len(KEYS)
+        self.dropped = 0
+        self.latency = StageTimes()  # event time to the step that used it
+        self.clock = clock
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def push(self, key, pressed):
+        # called from Tk: a timestamp and two array writes, nothing else
+        head = self.head
+        slot = head & self.mask
+        self.codes[slot] = key << 1 | pressed
+        self.times[slot] = self.clock()
+        self.head = head + 1
+        if head - self.tail > self.mask:
+            # the slot just written was the oldest event
+            self.tail += 1
+            self.dropped += 1
+
+    def handler(self, key, pressed):
+        # callback for screen.onkeypress / onkeyrelease, built once per binding
+        push = self.push
+        return lambda: push(key, pressed)
+
+    def drain(self, inputs):
+        # fill inputs with this step's keys and empty the ring
+        held = self.held
+        left = right = space = False  # pressed at some point since the last drain
+        head = self.head
+        if self.tail != head:
+            codes = self.codes
+            times = self.times
+            mask = self.mask
+            add = self.latency.add
+            now = self.clock()
+            for i in range(self.tail, head):
+                slot = i & mask
+                code = codes[slot]
+                key = code >> 1
+                pressed = code & 1 == 1
+                held[key] = pressed
+                if pressed:
+                    if key == KEY_LEFT:
+                        left = True
+                    elif key == KEY_RIGHT:
+                        right = True
+                    else:
+                        space = True
+                add(now - times[slot])
+            self.tail = head
+        inputs.left = left or held[KEY_LEFT]
+        inputs.right = right or held[KEY_RIGHT]
+        inputs.space = space or held[KEY_SPACE]
+        return inputs
+
+    def clear(self):
+        # forget pending events and held keys, e.g. when focus is lost
+        self.tail = self.head
+        self.held[:] = [False] * len(KEYS)
+
+    def summary(self):
+        # latency as a plain dict, times in milliseconds
+        p50, p95, p99 = self.latency.percentiles()
+        return {
+            "events": self.latency.count,
+            "dropped": self.dropped,
+            "mean_ms": self.latency.mean() * 1000,
+            "p50_ms": p50 * 1000,
+            "p95_ms": p95 * 1000,
+            "max_ms": self.latency.max * 1000,
+        }
+
+
+if __name__ == "__main__":
+    # a tap between two drains, key repeat and an overflowing ring
+    from world import Inputs
+    queue = InputQueue(8)
+    inputs = Inputs()
+    queue.push(KEY_SPACE, True)
+    queue.push(KEY_SPACE, False)
+    assert queue.drain(inputs).space, "tap inside one frame was lost"
+    assert not queue.drain(inputs).space, "tap held for more than one frame"
+
+    queue.push(KEY_RIGHT, True)
+    for _ in range(5):
+        queue.push(KEY_RIGHT, False)  # autorepeat as sent by X11
+        queue.push(KEY_RIGHT, True)
+    assert queue.dropped == 3 and len(queue) == 8
+    assert queue.drain(inputs).right and queue.drain(inputs).right
+    queue.push(KEY_RIGHT, False)
+    assert not queue.drain(inputs).right
+
+    calls = 1000000
+    push = queue.handler(KEY_LEFT, True)
+    start = time.perf_counter()
+    for _ in range(calls):
+        push()
+    elapsed = time.perf_counter() - start
+    print(f"Input queue ok, {elapsed / calls * 1e9:.0f} ns per key callback, "
+          "latency {mean_ms:.3f} ms mean".format(**queue.summary()))
@@ -0,0 +1,184 @@
+# levelgen.py
+import random
+import sys
+import time
+from constants import (ACCELERATION, AIR_FRICTION, FLOOR_PIXEL_LENGTH, FLOOR_SHAPE_LENGTH, GRAVITY,
+                       JUMP_DISTANCE, JUMP_FACTOR, MAX_SPEED, PLATFORM_GAP, PLAYER_COLLISION_TOLERANCE)
+
+# seeded platform layouts generated one floor at a time, each floor
+# reachable from the one below
+
+MIN_LENGTH = 6  # platform lengths in turtle shape units (20 px)
+MAX_LENGTH = 12
+REACH_MARGIN = 0.8  # share of the physical jump reach a layout may ask for
+
+
+def takeoff_speed(runway):
+    # horizontal speed after running from rest over runway pixels
+    dx = distance = 0
+    while distance < runway and dx < MAX_SPEED:
+        dx = min(MAX_SPEED, dx + ACCELERATION)
+        distance += dx
+    return dx
+
+
+def jump_reach(speed, rise=PLATFORM_GAP):
+    # farthest horizontal distance at which a jump taking off at speed can
+    # land rise pixels higher, holding the direction key all the way;
+    # follows the order of world.step_player
+    x = y = 0.0
+    dx = speed
+    dy = 0
+    reach = 0.0
+    jumped = False
+    while True:
+        dx += ACCELERATION
+        if not jumped:
+            dy = JUMP_DISTANCE + abs(dx) * JUMP_FACTOR
+            jumped = True
+        dy -= GRAVITY
+        dx = min(MAX_SPEED, dx * AIR_FRICTION)
+        if dy <= 0 and abs(y - rise) <= max(1, -dy):
+            reach = x
+        if dy < 0 and y < rise:
+            return reach
+        x += dx
+        y += dy
+
+
+def reach_envelope(lengths):
+    # length -> largest centre-to-centre x offset the next floor may have,
+    # not counting the half length of the next platform itself
+    envelope = {}
+    for length in lengths:
+        half_width = length * 10 + PLAYER_COLLISION_TOLERANCE
+        reach = jump_reach(takeoff_speed(2 * half_width))
+        envelope[length] = half_width + reach * REACH_MARGIN + PLAYER_COLLISION_TOLERANCE
+    return envelope
+
+
+# computed once at import, a reachability check is one dictionary lookup
+REACH = reach_envelope(list(range(MIN_LENGTH, MAX_LENGTH + 1)) + [FLOOR_SHAPE_LENGTH])
+
+
+def max_offset(length):
+    # largest |x| keeping a platform of length between the walls
+    return int((FLOOR_PIXEL_LENGTH - length * 20) // 2)
+
+
+def reachable(x, length, next_x, next_length):
+    return abs(next_x - x) <= REACH[length] + next_length * 10
+
+
+class LevelGenerator:
+    # endless iterator of (x, length) floors above the ground
+    #
+    # only the previous floor is kept, so each floor costs constant time and
+    # memory. x is drawn from the positions that are both between the walls
+    # and inside the jump envelope of the floor below.
+
+    __slots__ = ('rng', 'x', 'length')
+
+    def __init__(self, seed=None):
+        self.rng = random.Random()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        # start over above the full-width ground floor
+        self.rng.seed(seed)
+        self.x = 0
+        self.length = FLOOR_SHAPE_LENGTH
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        rng = self.rng
+        length = rng.randint(MIN_LENGTH, MAX_LENGTH)
+        limit = max_offset(length)
+        reach = int(REACH[self.length] + length * 10)
+        low = max(-limit, self.x - reach)
+        high = min(limit, self.x + reach)
+        x = rng.randint(low, high) if high >= low else max(-limit, min(limit, self.x))
+        self.x = x
+        self.length = length
+        return x, length
+
+    def place(self, plat):
+        # give a platform record the position and length of the next floor
+        plat.x, plat.length = next(self)
+
+
+def climbs(x, length, next_x, next_length):
+    # whether world.step_player can get from the floor (x, length) onto the
+    # next one: run from the far edge toward it, jump on some frame and steer
+    # to its centre in the air; world imports this module, so imported here
+    from tower import PlatformRing, PlatformState
+    from world import EVENT_JUMP, Inputs, PlayerState, WallState, step_player
+    from constants import HALF_SCREEN_WIDTH, PLAT_HALF_SIZE, PLAYER_HALF_SIZE, WALL_HALF_SIZE, WALL_PIXEL_SIZE
+
+    platforms = PlatformRing([PlatformState(x, 0, length), PlatformState(next_x, PLATFORM_GAP, next_length, 1)])
+    walls = [WallState(HALF_SCREEN_WIDTH - WALL_PIXEL_SIZE), WallState(-HALF_SCREEN_WIDTH + WALL_PIXEL_SIZE)]
+    direction = 1 if next_x >= x else -1
+    # just inside the far edge of the floor, short of the wall
+    wall_gap = HALF_SCREEN_WIDTH - WALL_PIXEL_SIZE - WALL_HALF_SIZE - PLAYER_HALF_SIZE - 1
+    start_x = max(-wall_gap, min(wall_gap, x - direction * (length * 10 + PLAYER_COLLISION_TOLERANCE - 1)))
+    standing_y = PLAT_HALF_SIZE + PLAYER_HALF_SIZE
+    player = PlayerState(start_x, standing_y)
+    events = []
+    takeoff = 0
+    while True:
+        player.reset(start_x, standing_y)
+        jumped = False
+        for frame in range(1000):
+            inputs = Inputs()
+            if not jumped:
+                # run toward the next floor, jump on the takeoff frame
+                inputs.left, inputs.right = direction < 0, direction > 0
+                inputs.space = frame == takeoff
+            elif abs(next_x - player.x) > 1:
+                inputs.left, inputs.right = next_x < player.x, next_x > player.x
+            step_player(player, inputs, platforms, walls, events)
+            if not jumped:
+                if EVENT_JUMP in events:
+                    jumped = True
+                elif not player.can_jump:
+                    break  # ran off the edge before the takeoff frame
+            elif player.can_jump:
+                if player.y > PLATFORM_GAP:
+                    return True
+                break  # back on the floor it took off from
+            elif player.y < 0:
+                break
+        if not jumped:
+            return False
+        events.clear()
+        takeoff += 1
+
+
+if __name__ == "__main__":
+    # stream floors and check every one against the envelope, then fly the
+    # first of them with the game's own physics
+    floors = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    simulated = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    levels = LevelGenerator(0)
+    x, length = levels.x, levels.length
+    start = time.perf_counter()
+    for _ in range(floors):
+        next_x, next_length = next(levels)
+        assert reachable(x, length, next_x, next_length), (x, length, next_x, next_length)
+        x, length = next_x, next_length
+    elapsed = time.perf_counter() - start
+    print(f"{floors} floors, all reachable, {floors / elapsed:.0f} floors/s")
+    print("Reach from each platform length, centre to next platform edge (px): " +
+          ", ".join(f"{length}: {reach:.0f}" for length, reach in REACH.items()))
+
+    levels.reset(0)
+    x, length = levels.x, levels.length
+    start = time.perf_counter()
+    for floor in range(simulated):
+        next_x, next_length = next(levels)
+        assert climbs(x, length, next_x, next_length), (floor, x, length, next_x, next_length)
+        x, length = next_x, next_length
+    elapsed = time.perf_counter() - start
+    print(f"{simulated} floors climbed with step_player, {simulated / elapsed:.0f} floors/s")
@@ -1,353 +1,300 @@
-# main.py
-import turtle
-import random
-from constants import (SCREEN_HEIGHT, SCREEN_WIDTH, SCREEN_MARGIN, SCROLL_THRESHOLD,
-                       FAST_SCROLL_SPEED, PLAT_PIXEL_SIZE, PLAYER_PIXEL_SIZE,
-                       JUMP_DISTANCE, MAX_SCROLL_SPEED, WALL_PIXEL_SIZE, GROUND_Y,
-                       PLAYER_START_Y, FLOOR_SHAPE_LENGTH, FLOOR_PIXEL_LENGTH, FAST_SCROLL_Y,
-                       HALF_PLAT_SIZE, HALF_SCREEN_HEIGHT, HALF_SCREEN_WIDTH, HALF_PLAYER_SIZE,
-                       PLATFORM_GAP, FRAME_TIME)
-
-from renderer import Wall, Platform, Score, Star, Bonus
-from actors import Player
-
-
-def init_screen():
-    # initialize Main Game Screen
-    screen = turtle.Screen()
-    screen.tracer(0)
-    screen.title("StudentTower")
-    screen.setup(SCREEN_WIDTH, SCREEN_HEIGHT)
-    screen.bgpic("backgroundAGH.gif")
-
-    # register all shapes at once for better performance
-    shapes = [
-        "plat.gif", "plat120.gif", "plat140.gif", "plat160.gif",
-        "plat180.gif", "plat200.gif", "plat220.gif", "plat240.gif",
-        "student2.gif", "studentprawo.gif", "studentlewo.gif",
-        "45.gif", "90.gif", "135.gif", "315.gif", "270.gif", "225.gif", "180.gif",
-        "image.gif"
-    ]
-    for shape in shapes:
-        try:
-            screen.register_shape(shape)
-        except:
-            # if shape file doesn't exist, skip it
-            print(f"Warning: Could not load shape {shape}")
-            pass
-
-    return screen
-
-
-def bind_controls(screen, player):
-    # keyboard & mouse bindings
-    screen.listen()
-    screen.onkeypress(player.go_right, "Right")
-    screen.onkeyrelease(player.stop_right, "Right")
-    screen.onkeypress(player.go_left, "Left")
-    screen.onkeyrelease(player.stop_left, "Left")
-    screen.onkeypress(player.press_space, "space")
-    screen.onkeyrelease(player.release_space, "space")
-
-
-def scroll_world(walls, platforms, player, stars, bonuses):
-
-    # world scrolling with efficient platform recycling.
-
-    # start scrolling once the player rises above threshold
-    if not player.scroll_active and player.ycor() > SCROLL_THRESHOLD:
-        player.scroll_active = True
-
-    if not player.scroll_active:
-        return
-
-    # determine scroll speed
-    speed = FAST_SCROLL_SPEED if player.ycor() > FAST_SCROLL_Y else player.scroll_speed
-
-    # move all objects down in a single loop
-    all_objects = platforms + walls + [player] + stars + bonuses
-    for obj in all_objects:
-        obj.sety(obj.ycor() - speed)
-
-    # optimized platform recycling
-    platforms_to_recycle = []
-    top_y = float('-inf')
-    max_floor = 0
-
-    # single pass to find recyclable platforms and current top
-    for plat in platforms:
-        if plat.ycor() + HALF_PLAT_SIZE < -HALF_SCREEN_HEIGHT:
-            platforms_to_recycle.append(plat)
-        else:
-            top_y = max(top_y, plat.ycor())
-            max_floor = max(max_floor, plat.floor_num)
-
-    # recycle platforms efficiently
-    next_floor = max_floor + 1
-    for plat in platforms_to_recycle:
-        new_y = top_y + PLATFORM_GAP
-        top_y = new_y  # Update for next platform
-
-        plat.floor_num = next_floor
-        next_floor += 1
-
-        # calculate new x-position (FIXED - ensure integer division)
-        max_x = int((FLOOR_PIXEL_LENGTH - plat.length * 20) // 2)
-        new_x = random.randint(-max_x, max_x) if max_x > 0 else 0
-        plat.goto(new_x, new_y)
-
-    # remove bonuses that have fallen off screen
-    bonuses_to_remove = []
-    for bonus in bonuses:
-        if bonus.ycor() < -HALF_SCREEN_HEIGHT:
-            bonuses_to_remove.append(bonus)
-
-    for bonus in bonuses_to_remove:
-        bonus.hideturtle()
-        bonuses.remove(bonus)
-
-
-def spawn_bonus(platforms, bonuses, player):
-    # spawn bonuses on platforms that are above the player with improved logic.
-
-    # reduced chance for more balanced gameplay (1 in 300 chance per frame)
-    if random.randint(1, 300) != 1:
-        return
-
-    # get player's current Y position
-    player_y = player.ycor()
-
-    # find platforms that are above the player and visible on screen
-    eligible_platforms = []
-
-    for plat in platforms:
-        # platform must be above player by at least one platform gap
-        min_height_above_player = player_y + PLATFORM_GAP * 1.5
-
-        # check if platform is above player and within reasonable spawn range
-        platform_y = plat.ycor()
-        if (platform_y > min_height_above_player and
-                platform_y < player_y + HALF_SCREEN_HEIGHT * 1.5):  # Don't spawn too far ahead
-
-            # check if platform doesn't already have a bonus nearby
-            has_bonus = False
-            for bonus in bonuses:
-                if (abs(bonus.xcor() - plat.xcor()) < plat.length * 15 and
-                        abs(bonus.ycor() - platform_y) < 50):
-                    has_bonus = True
-                    break
-
-            if not has_bonus:
-                eligible_platforms.append(plat)
-
-    # spawn bonus on random eligible platform above player
-    if eligible_platforms:
-        chosen_platform = random.choice(eligible_platforms)
-
-        # place bonus on the platform with some random horizontal offset
-        # FIX: Convert to integer to avoid float error with randint
-        max_offset = int(chosen_platform.length * 8)
-        # Ensure max_offset is positive to avoid randint errors
-        if max_offset > 0:
-            bonus_x = chosen_platform.xcor() + random.randint(-max_offset, max_offset)
-        else:
-            bonus_x = chosen_platform.xcor()
-        bonus_y = chosen_platform.ycor() + HALF_PLAT_SIZE + 20  # Slightly above platform
-
-        bonus = Bonus(bonus_x, bonus_y)
-        bonuses.append(bonus)
-
-        print(f"Bonus spawned at ({bonus_x:.0f}, {bonus_y:.0f}) - Player at {player_y:.0f}")
-
-
-def check_bonus_collision(player, bonuses, score_display):
-
-    # check if player collides with any bonuses and handle collection.
-
-    bonuses_to_remove = []
-
-    for bonus in bonuses:
-        # collision detection using the bonus hitbox
-        distance = ((player.xcor() - bonus.xcor()) ** 2 + (player.ycor() - bonus.ycor()) ** 2) ** 0.5
-
-        if distance < bonus.HITBOX:
-            # bonus collected add points and remove bonus
-            score_display.score += bonus.VALUE
-            bonus.hideturtle()
-            bonuses_to_remove.append(bonus)
-            print(f"Bonus collected! +{bonus.VALUE} points")
-
-    # remove collected bonuses
-    for bonus in bonuses_to_remove:
-        bonuses.remove(bonus)
-
-
-def restart_game(screen):
-    # restart game state completely.
-    screen.clear()
-
-    # reload screen
-    screen.bgpic("backgroundAGH.gif")
-    screen.title("StudentTower")
-    screen.setup(SCREEN_WIDTH, SCREEN_HEIGHT)
-    screen.tracer(0)
-
-    # reload of shapes
-    shapes = [
-        "plat.gif", "plat120.gif", "plat140.gif", "plat160.gif",
-        "plat180.gif", "plat200.gif", "plat220.gif", "plat240.gif",
-        "student2.gif", "studentprawo.gif", "studentlewo.gif",
-        "45.gif", "90.gif", "135.gif", "315.gif", "270.gif", "225.gif", "180.gif",
-        "image.gif"
-    ]
-    for shape in shapes:
-        try:
-            screen.register_shape(shape)
-        except:
-            # If shape file doesn't exist, skip it
-            print(f"Warning: Could not load shape {shape}")
-            pass
-
-    # making the objects
-    walls = [
-        Wall(HALF_SCREEN_WIDTH - WALL_PIXEL_SIZE),
-        Wall(-HALF_SCREEN_WIDTH + WALL_PIXEL_SIZE)
-    ]
-    platforms = create_platforms()
-    player = Player(0, PLAYER_START_Y, platforms, walls)
-    score_display = Score()
-    stars = []
-    bonuses = []
-
-    bind_controls(screen, player)
-    game_loop(screen, walls, platforms, player, score_display, stars, bonuses)
-
-
-def update_stars(player, stars):
-    # generate star on jump
-    if player.dy > JUMP_DISTANCE:
-        star = Star(player.xcor(), player.ycor() - HALF_PLAYER_SIZE)
-        stars.append(star)
-
-    # update and remove stars (reverse iteration for safe removal)
-    for i in range(len(stars) - 1, -1, -1):
-        star = stars[i]
-        star.update()
-        if star.ycor() < -HALF_SCREEN_HEIGHT:
-            star.hideturtle()
-            del stars[i]
-
-
-def update_score(player, platforms, score_display):
-    feet_y = player.ycor() - HALF_PLAYER_SIZE
-
-    # find highest valid platform more efficiently
-    best_floor = player.highest_floor
-    for plat in platforms:
-        if (plat.ycor() + HALF_PLAT_SIZE <= feet_y and
-                plat.floor_num > best_floor):
-            best_floor = plat.floor_num
-
-    # update score if higher floor is found
-    if best_floor > player.highest_floor:
-        # C\calculate the floor score difference and add it to current score
-        floor_score_increase = (best_floor - player.highest_floor) * 100
-        score_display.score += floor_score_increase  # add to existing score instead of overwriting
-        player.highest_floor = best_floor
-
-    # increase scroll speed every 3000 points (difficulty scaling)
-    if (score_display.score >= player.scroll_speed_threshold and
-            player.scroll_speed < MAX_SCROLL_SPEED):
-        player.scroll_speed += 1
-        player.scroll_speed_threshold += 3000
-
-    # update score display
-    score_display.update(score_display.score)
-
-
-def game_loop(screen, walls, platforms, player, score_display, stars, bonuses):
-    # update player movement
-    player.update()
-
-    # handle star effects
-    update_stars(player, stars)
-
-    # scroll world and recycle off-screen platforms
-    scroll_world(walls, platforms, player, stars, bonuses)
-
-    # spawn bonuses above the player
-    spawn_bonus(platforms, bonuses, player)
-
-    # check bonus collisions
-    check_bonus_collision(player, bonuses, score_display)
-
-    # update scoring
-    update_score(player, platforms, score_display)
-
-    # game over check
-    if player.ycor() + HALF_PLAYER_SIZE < -HALF_SCREEN_HEIGHT:
-        score_display.clear()
-        score_display.game_over(screen, lambda: restart_game(screen))
-        return
-
-    # update screen and schedule next frame
-    screen.update()
-    screen.ontimer(lambda: game_loop(screen, walls, platforms, player, score_display, stars, bonuses), FRAME_TIME)
-
-
-def create_platforms():
-    # create initial platforms efficiently
-    platforms = [Platform(0, GROUND_Y, FLOOR_SHAPE_LENGTH)]
-
-    for i in range(30):
-        length = random.randint(6, 12)
-        # FIX: Ensure integer values for randint
-        max_x = int((FLOOR_PIXEL_LENGTH - length * 20) // 2)
-        plat_x = random.randint(-max_x, max_x) if max_x > 0 else 0
-        plat_y = GROUND_Y + (i + 1) * PLATFORM_GAP
-
-        platform = Platform(plat_x, plat_y, length)
-        platform.floor_num = i + 1
-        platforms.append(platform)
-
-    return platforms
-
-
-def main():
-    # create screen
-    screen = init_screen()
-
-    # create walls
-    walls = [
-        Wall(HALF_SCREEN_WIDTH - WALL_PIXEL_SIZE),
-        Wall(-HALF_SCREEN_WIDTH + WALL_PIXEL_SIZE)
-    ]
-
-    # create platforms
-    platforms = create_platforms()
-
-    # create player
-    player = Player(0, PLAYER_START_Y, platforms, walls)
-
-    # create score display
-    score_display = Score()
-
-    # create stars list
-    stars = []
-
-    # create bonuses list
-    bonuses = []
-
-    # keyboard bindings
-    bind_controls(screen, player)
-
-    # start game loop
-    game_loop(screen, walls, platforms, player, score_display, stars, bonuses)
-
-    # keep window open
-    screen.mainloop()
-
-
-# open only if run directly:
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+# main.py
+import argparse
+import atexit
+import sys
+import time
+import turtle
+from tkinter import TclError
+from constants import SCREEN_HEIGHT, SCREEN_WIDTH
+
+from renderer import Scene, create_base_turtle
+from render_backends import BACKENDS, create_backend
+from assets import ASSETS, BACKGROUND, BACKGROUND_TILE_HEIGHT, IMAGES
+from atlas import rotation_frames
+from audio import AUDIO
+from highscores import HIGHSCORES
+from input_queue import KEYS
+from profiler import PROFILER
+from replay import InputLog, Recorder, Replayer, new_seed, session_path
+from actors import Player
+from bot import BeamBot
+from scheduler import FixedStepScheduler
+from snapshots import SNAPSHOTS, dump_snapshots
+from world import World, BONUS_VALUE, EVENT_BONUS_SPAWNED, EVENT_BONUS_COLLECTED
+
+
+def init_screen():
+    # initialize Main Game Screen
+    screen = turtle.Screen()
+    screen.tracer(0)
+    screen.title("StudentTower")
+    screen.setup(SCREEN_WIDTH, SCREEN_HEIGHT)
+    return screen
+
+
+def register_asset(screen, name):
+    # hand a cached image to turtle as a shape; the background as its tiles
+    if name == BACKGROUND:
+        for tile in ASSETS.tile_names(BACKGROUND, BACKGROUND_TILE_HEIGHT):
+            register_asset(screen, tile)
+        return
+    screen.register_shape(name, turtle.Shape("image", ASSETS.image(name)))
+
+
+def register_rotation_frames(screen):
+    # player spin frames, cut from the cached atlas (built first if missing)
+    for frame in rotation_frames():
+        register_asset(screen, frame)
+
+
+def register_assets(screen):
+    # load every image synchronously
+    ASSETS.check()
+    for name in IMAGES:
+        register_asset(screen, name)
+    register_rotation_frames(screen)
+
+
+def load_assets(screen, on_ready):
+    # read files in the background behind a splash; every image whose bytes
+    # have arrived is decoded in the same tick, the splash only redraws on progress
+    start = time.perf_counter()
+    ASSETS.preload()
+    splash = create_base_turtle()
+    splash.pencolor("black")
+    pending = list(IMAGES)
+    shown = None
+
+    def poll():
+        # an exception raised here would only be printed by Tk, leaving the splash up for good
+        nonlocal shown
+        try:
+            if ASSETS.error is not None:
+                # the background read failed: read the rest here, once more
+                print(f"Warning: background asset loading failed ({ASSETS.error}), loading synchronously")
+                ASSETS.error = None
+                for name in pending:
+                    ASSETS.read(name)
+            while pending and ASSETS.is_loaded(pending[0]):
+                register_asset(screen, pending.pop(0))
+        except (OSError, TclError) as e:
+            show_load_error(screen, splash, e)
+            return
+        if pending or not ASSETS.done():
+            if shown != len(pending):
+                shown = len(pending)
+                splash.clear()
+                splash.write(f"Ładowanie... {len(IMAGES) - len(pending)}/{len(IMAGES)}",
+                             align="center", font=("Courier", 24, "bold"))
+                screen.update()
+            screen.ontimer(poll, 10)
+            return
+        splash.clear()
+        register_rotation_frames(screen)
+        print(f"{ASSETS.report()}, ready after {(time.perf_counter() - start) * 1000:.0f} ms")
+        on_ready()
+
+    poll()
+
+
+def show_load_error(screen, splash, error):
+    # replace the splash with the error; the game does not start
+    print(f"Error: could not load game assets: {error}", file=sys.stderr)
+    splash.clear()
+    splash.color("crimson")
+    splash.write(f"Nie można wczytać zasobów:\n{error}", align="center", font=("Courier", 14, "bold"))
+    screen.update()
+
+
+def bind_controls(screen, player):
+    # keyboard & mouse bindings
+    # key events only go into the player's queue; each step drains it once
+    screen.listen()
+    events = player.events
+    for keysym, key in KEYS.items():
+        screen.onkeypress(events.handler(key, True), keysym)
+        screen.onkeyrelease(events.handler(key, False), keysym)
+
+
+def toggle_profiler(scene):
+    # F3: start or stop timing the frame stages
+    PROFILER.toggle()
+    if not PROFILER.enabled:
+        scene.profiler_hud.hide()
+
+
+def export_profile(path):
+    # write the collected timings, if the profiler was ever on
+    if PROFILER.stages:
+        PROFILER.export_csv(path)
+        print(f"Frame profile written to {path}")
+
+
+def reset_game(world, player, scene, seed=None):
+    # put the existing world and sprites back to a fresh random layout
+    world.reset(seed)
+    scene.reset(world)
+    player.sync(world.player, world.camera)
+
+
+def restart_game(screen, world, player, scene):
+    # start a new recorded game on the existing screen, world and sprites
+    log = InputLog(new_seed())
+    reset_game(world, player, scene, log.seed)
+    return game_loop(screen, world, player, scene, Recorder(player, log), log)
+
+
+def handle_events(world, player, scene):
+    # react to the events of the last world step
+    player.play_sounds(world.events)
+    scene.release_removed(world)
+
+    spawned = iter(world.spawned)
+    for event in world.events:
+        if event == EVENT_BONUS_SPAWNED:
+            bonus = next(spawned)
+            print(f"Bonus spawned at ({bonus.x:.0f}, {bonus.y:.0f}) - Player at {world.player.y:.0f}")
+        elif event == EVENT_BONUS_COLLECTED:
+            print(f"Bonus collected! +{BONUS_VALUE} points")
+
+
+def game_loop(screen, world, player, scene, source, log=None):
+    # run the world at a fixed 60 Hz timestep and render when there is time
+    #
+    # source.next() supplies the inputs of each step (None ends the game);
+    # a recorded log is saved when the game ends. while the profiler is on,
+    # every stage is timed separately. every step is captured into the
+    # snapshot ring, which is dumped at game over and when a step crashes;
+    # Backspace rewinds a recorded game by a few seconds.
+
+    def update():
+        inputs = source.next()
+        if inputs is None:
+            return False
+        try:
+            if PROFILER.enabled:
+                PROFILER.step_world(world, inputs)
+                PROFILER.call("handle_events", handle_events, world, player, scene)
+                PROFILER.call("snapshot", SNAPSHOTS.capture, world)
+            else:
+                world.step(inputs)
+                handle_events(world, player, scene)
+                SNAPSHOTS.capture(world)
+        except Exception:
+            print(f"World snapshots written to {dump_snapshots('crash')}")
+            raise
+        return not world.game_over
+
+    def rewind():
+        # Backspace: back to a state a few seconds ago; the log forgets the undone steps
+        if not scheduler.running:
+            return
+        frame = SNAPSHOTS.rewind(world)
+        del log.frames[frame:]
+        scene.release_removed(world)
+        render()
+
+    def render():
+        if PROFILER.enabled:
+            PROFILER.call("player.sync", player.sync, world.player, world.camera)
+            PROFILER.call("scene.sync", scene.sync, world)
+            scene.profiler_hud.draw(PROFILER)
+            PROFILER.call("backend.flush", scene.backend.flush)
+            return
+        player.sync(world.player, world.camera)
+        scene.sync(world)
+        scene.backend.flush()
+
+    def game_over():
+        stats = scheduler.stats.summary()
+        print("Frames: {frames}, steps: {steps}, skipped renders: {skipped_renders}, "
+              "frame time: {mean_ms:.2f} ms mean, {max_ms:.2f} ms max".format(**stats))
+        for name, pool in scene.pool_stats().items():
+            print(f"Sprite pool {name}: {pool['live']} live, {pool['pooled']} pooled, {pool['created']} created")
+        print("Canvas operations per frame: {ops_mean:.1f} mean, {ops_peak} peak".format(**scene.backend.stats.summary()))
+        if player.events.latency.count:
+            print("Input latency: {events} events, {mean_ms:.2f} ms mean, {p95_ms:.2f} ms p95, "
+                  "{max_ms:.2f} ms max, {dropped} dropped".format(**player.events.summary()))
+        print(f"World snapshots written to {dump_snapshots('gameover')}")
+        rank = None
+        if log is not None:
+            path = session_path()
+            log.save(path)
+            print(f"Session recorded to {path}")
+            # replays are not new runs, only recorded games enter the leaderboard
+            rank = HIGHSCORES.record(world.score, world.player.highest_floor, world.frame, log.seed)
+            print(f"Leaderboard: rank {rank} of {len(HIGHSCORES)}, best {HIGHSCORES.best()}")
+        if player.autopilot is not None and log is not None:
+            # the bot plays on without waiting for a click
+            print("Planning: {mean_ms:.3f} ms mean, {max_ms:.3f} ms max, cache hit rate {hit_rate:.0%}"
+                  .format(**player.autopilot.stats.summary()))
+            restart_game(screen, world, player, scene)
+            return
+        scene.score_display.clear()
+        scene.score_display.game_over(screen, lambda: restart_game(screen, world, player, scene),
+                                      rank, len(HIGHSCORES))
+
+    scheduler = FixedStepScheduler(screen.ontimer, update, render, game_over)
+    # replays must follow their log, so only recorded games can rewind
+    screen.onkeypress(rewind if log is not None else None, "BackSpace")
+    scheduler.start()
+    return scheduler
+
+
+def start_game(screen, backend, replay_log=None, autoplay=False):
+    # build a new world with its sprites and start the game loop
+    world = World()
+    scene = Scene(world, backend)
+    player = Player(backend, world.player.x, world.player.y)
+    if autoplay:
+        player.autopilot = BeamBot(world)
+
+    # keyboard bindings
+    bind_controls(screen, player)
+    screen.onkeypress(lambda: toggle_profiler(scene), "F3")
+
+    # start game loop
+    if replay_log is not None:
+        reset_game(world, player, scene, replay_log.seed)
+        game_loop(screen, world, player, scene, Replayer(replay_log))
+    else:
+        restart_game(screen, world, player, scene)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StudentTower")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recorded session")
+    parser.add_argument("--autoplay", action="store_true", help="let the beam search bot play")
+    parser.add_argument("--renderer", choices=list(BACKENDS), default="turtle",
+                        help="drawing backend: turtle (reference), canvas (faster) or null (no drawing)")
+    parser.add_argument("--profile", action="store_true", help="start with the frame profiler on (F3 toggles)")
+    parser.add_argument("--profile-csv", metavar="FILE", default="profile.csv",
+                        help="where frame timings are written on exit (default: profile.csv)")
+    args = parser.parse_args()
+    replay_log = InputLog.load(args.replay) if args.replay else None
+    PROFILER.enabled = args.profile
+    atexit.register(export_profile, args.profile_csv)
+    # rebuild the leaderboard index before the first game
+    HIGHSCORES.open()
+    atexit.register(HIGHSCORES.close)
+
+    # create screen
+    screen = init_screen()
+
+    def on_ready():
+        # decode sounds and start the audio worker, then create world and sprites
+        AUDIO.start()
+        # reaps the player processes and removes the temporary sound files
+        atexit.register(AUDIO.stop)
+        start_game(screen, create_backend(args.renderer, screen), replay_log, args.autoplay)
+
+    # load assets behind a splash, then start the game loop
+    load_assets(screen, on_ready)
+
+    # keep window open
+    screen.mainloop()
+
+
+# open only if run directly:
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# particles.py
+from constants import GRAVITY
+from entities import EntityStore
+
+MAX_STARS = 48
+STAR_ROTATION_SPEED = 15
+STAR_COLOR_COUNT = 8
+STAR_COLUMNS = (("x", 'd'), ("y", 'd'), ("dy", 'd'), ("angle", 'd'), ("color", 'B'))
+
+
+class StarEmitter(EntityStore):
+    # fixed-size jump star particles kept in an entities.EntityStore
+    #
+    # live particles occupy indices [0, count); a dead particle is replaced by
+    # the last live one, so no memory is allocated after construction.
+
+    def __init__(self, capacity=MAX_STARS):
+        EntityStore.__init__(self, STAR_COLUMNS, capacity)
+
+    def emit(self, x, y, angle, color):
+        # add a particle at rest; ignored when the emitter is full
+        if self.count == self.capacity:
+            return False
+        self.add(x, y, 0, angle, color)
+        return True
+
+    def update(self, bottom):
+        # apply gravity and rotation, drop particles that fell below bottom
+        if not self.count:
+            return
+        self.fall(GRAVITY)
+        self.offset("angle", STAR_ROTATION_SPEED)
+        self.remove_rows(self.rows_below("y", bottom))
@@ -0,0 +1,36 @@
+# pool.py
+
+
+class Pool:
+    # free list of reusable objects with live/pooled counters
+    #
+    # factory() builds a new object when the free list is empty,
+    # on_release(obj) runs when an object goes back to the pool (e.g. hide it).
+
+    __slots__ = ('factory', 'on_release', 'free', 'live', 'created')
+
+    def __init__(self, factory, on_release=None):
+        self.factory = factory
+        self.on_release = on_release
+        self.free = []
+        self.live = 0
+        self.created = 0
+
+    def acquire(self):
+        # reuse a released object or build a new one
+        if self.free:
+            obj = self.free.pop()
+        else:
+            obj = self.factory()
+            self.created += 1
+        self.live += 1
+        return obj
+
+    def release(self, obj):
+        if self.on_release is not None:
+            self.on_release(obj)
+        self.live -= 1
+        self.free.append(obj)
+
+    def stats(self):
+        return {"live": self.live, "pooled": len(self.free), "created": self.created}
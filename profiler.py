@@ -0,0 +1,100 @@
+# profiler.py
+import csv
+import time
+from array import array
+
+# optional per-stage frame timings; game_loop only checks PROFILER.enabled when it is off
+
+PROFILE_WINDOW = 600  # samples kept per stage for the rolling percentiles (10 s at 60 Hz)
+PERCENTILES = (50, 95, 99)
+
+
+class StageTimes:
+    # rolling window of one stage's durations plus running totals, in seconds
+
+    __slots__ = ('samples', 'index', 'filled', 'count', 'total', 'max')
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.samples = array('d', bytes(8 * window))
+        self.index = 0
+        self.filled = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        samples = self.samples
+        samples[self.index] = seconds
+        self.index = (self.index + 1) % len(samples)
+        if self.filled < len(samples):
+            self.filled += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentiles(self, points=PERCENTILES):
+        # nearest-rank percentiles of the current window
+        if not self.filled:
+            return [0.0] * len(points)
+        window = sorted(self.samples[:self.filled])
+        last = len(window) - 1
+        return [window[min(last, int(point / 100 * len(window)))] for point in points]
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class FrameProfiler:
+    # times every stage of a frame while enabled
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.enabled = False
+        self.window = window
+        self.stages = {}  # stage name -> StageTimes, in first-seen order
+        self.clock = time.perf_counter
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def times(self, name):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageTimes(self.window)
+        return stage
+
+    def call(self, name, func, *args):
+        # run func(*args) and record its duration under name
+        start = self.clock()
+        result = func(*args)
+        self.times(name).add(self.clock() - start)
+        return result
+
+    def step_world(self, world, inputs):
+        # world.step with every stage timed separately
+        clock = self.clock
+        world.begin_step(inputs)
+        for name in world.STAGES:
+            start = clock()
+            getattr(world, name)()
+            self.times(name).add(clock() - start)
+        world.end_step()
+
+    def summary(self):
+        # one row per stage: name, calls, mean, p50, p95, p99, max (milliseconds)
+        rows = []
+        for name, stage in self.stages.items():
+            p50, p95, p99 = stage.percentiles()
+            rows.append((name, stage.count, stage.mean() * 1000,
+                         p50 * 1000, p95 * 1000, p99 * 1000, stage.max * 1000))
+        return rows
+
+    def export_csv(self, path):
+        with open(path, "w", newline="") as output:
+            writer = csv.writer(output)
+            writer.writerow(["stage", "calls", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+            for name, calls, *timings in self.summary():
+                writer.writerow([name, calls] + [f"{value:.4f}" for value in timings])
+
+
+PROFILER = FrameProfiler()
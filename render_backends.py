@@ -0,0 +1,484 @@
+# render_backends.py
+import math
+import turtle
+from assets import ASSETS
+from renderer import GeneralPen, create_base_turtle
+
+# drawing primitives behind renderer.Scene
+#
+# every backend hands out sprites (set_shape, move_to, turn_to, set_color,
+# set_visible) and text items (move_to, write_text, clear_text) that remember
+# what they last pushed, pens for the game over screen (turtle drawing calls),
+# plus flush() once per frame:
+#   turtle - turtle.Turtle per sprite, the reference implementation
+#   canvas - tkinter Canvas items managed directly, no turtle bookkeeping
+#   null   - nothing is drawn, for headless runs and benchmarks
+
+# turtle's built-in polygon shapes, so the canvas backend draws the same stars
+POLYGONS = {
+    "turtle": ((0, 16), (-2, 14), (-1, 10), (-4, 7), (-7, 9), (-9, 8), (-6, 5), (-7, 1), (-5, -3),
+               (-8, -6), (-6, -8), (-4, -5), (0, -7), (4, -5), (6, -8), (8, -6), (5, -3), (7, 1),
+               (6, 5), (9, 8), (7, 9), (4, 7), (1, 10), (2, 14)),
+    "circle": tuple((10 * math.cos(math.radians(a)), 10 * math.sin(math.radians(a)))
+                    for a in range(0, 360, 18)),
+    "square": ((10, -10), (10, 10), (-10, 10), (-10, -10)),
+    "triangle": ((10, -5.77), (0, 11.55), (-10, -5.77)),
+}
+TEXT_ANCHORS = {"left": "sw", "center": "s", "right": "se"}  # as turtle.write
+
+
+class RenderStats:
+    # canvas operations needed per frame
+
+    __slots__ = ('ops', 'frames', 'total', 'last', 'peak')
+
+    def __init__(self):
+        self.ops = 0  # operations of the frame being built
+        self.frames = 0
+        self.total = 0
+        self.last = 0
+        self.peak = 0
+
+    def end_frame(self):
+        self.frames += 1
+        self.total += self.ops
+        self.last = self.ops
+        if self.ops > self.peak:
+            self.peak = self.ops
+        self.ops = 0
+
+    def summary(self):
+        return {
+            "frames": self.frames,
+            "ops_mean": self.total / self.frames if self.frames else 0.0,
+            "ops_last": self.last,
+            "ops_peak": self.peak,
+        }
+
+
+class TurtleSprite(GeneralPen):
+    # sprite drawn by its own turtle; changes are applied to the turtle
+    # right away and its canvas item is redrawn by TurtleBackend.flush()
+
+    __slots__ = ('backend', 'drawn_shape', 'drawn_position', 'drawn_heading', 'drawn_color')
+
+    def __init__(self, backend, shape, size):
+        GeneralPen.__init__(self)
+        self.backend = backend
+        self.drawn_shape = None
+        self.drawn_position = None
+        self.drawn_heading = None
+        self.drawn_color = None
+        if size != 1:
+            self.shapesize(size)
+        self.set_shape(shape)
+
+    def set_shape(self, name):
+        if name != self.drawn_shape:
+            self.shape(name)
+            self.drawn_shape = name
+            self.backend.mark(self)
+
+    def move_to(self, x, y):
+        position = (x, y)
+        if position != self.drawn_position:
+            self.drawn_position = position
+            self.goto(x, y)
+            self.backend.mark(self)
+
+    def turn_to(self, heading):
+        if heading != self.drawn_heading:
+            self.drawn_heading = heading
+            self.setheading(heading)
+            self.backend.mark(self)
+
+    def set_color(self, color):
+        if color != self.drawn_color:
+            self.drawn_color = color
+            self.color(color)
+            self.backend.mark(self)
+
+    def set_visible(self, visible):
+        if visible != self.isvisible():
+            if visible:
+                self.showturtle()
+            else:
+                self.hideturtle()
+            self.backend.mark(self)
+
+
+class TurtleText(GeneralPen):
+    # text written by a hidden turtle; the Tk text item is replaced only when the text changes
+
+    __slots__ = ('stats', 'font', 'align', 'drawn_text')
+
+    def __init__(self, backend, x, y, color, font, align):
+        GeneralPen.__init__(self)
+        self.stats = backend.stats
+        self.font = font
+        self.align = align
+        self.drawn_text = None
+        self.pencolor(color)
+        self.goto(x, y)
+
+    def move_to(self, x, y):
+        if (x, y) != self.position():
+            # written text stays where it was written, rewrite it at the new place
+            text = self.drawn_text
+            self.clear_text()
+            self.goto(x, y)
+            if text is not None:
+                self.write_text(text)
+
+    def write_text(self, text):
+        if text != self.drawn_text:
+            self.stats.ops += 1 if self.drawn_text is None else 2  # delete + create
+            self.drawn_text = text
+            self.clear()
+            self.write(text, align=self.align, font=self.font)
+
+    def clear_text(self):
+        if self.drawn_text is not None:
+            self.stats.ops += 1
+            self.drawn_text = None
+        self.clear()
+
+
+class TurtleBackend:
+    # reference backend: every sprite is a turtle on the turtle screen
+    #
+    # screen.update() redraws every turtle ever created, visible or not;
+    # flush() redraws just the sprites marked since the last frame.
+
+    name = "turtle"
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.dirty = {}  # sprite -> None, an insertion-ordered set
+        self.stats = RenderStats()
+
+    def sprite(self, shape, size=1):
+        return TurtleSprite(self, shape, size)
+
+    def text(self, x, y, color, font, align="left"):
+        return TurtleText(self, x, y, color, font, align)
+
+    def pen(self):
+        return create_base_turtle()
+
+    def mark(self, sprite):
+        self.dirty[sprite] = None
+
+    def flush(self):
+        redraw_turtles(self.screen, self.dirty)
+        self.stats.ops += len(self.dirty)
+        self.dirty.clear()
+        self.stats.end_frame()
+
+
+# TurtleScreen.update() in CPython's turtle.py turns screen._tracing on, calls
+# _drawturtle() on every turtle (it draws nothing while tracing is off) and
+# ends with _update(), which is canvas.update(). redraw_turtles() does the same
+# for only the given turtles; these internals are the one place the turtle
+# backend depends on, and without them it falls back to the full update()
+PARTIAL_REDRAW = hasattr(turtle.RawTurtle, "_drawturtle") and hasattr(turtle.TurtleScreen, "_update")
+
+
+def redraw_turtles(screen, turtles):
+    # draw the turtles' current state and refresh the canvas
+    if not PARTIAL_REDRAW or not hasattr(screen, "_tracing"):
+        screen.update()
+        return
+    tracing = screen._tracing
+    screen._tracing = 1
+    try:
+        for sprite in turtles:
+            sprite._drawturtle()
+    finally:
+        screen._tracing = tracing
+    screen._update()
+
+
+class CanvasSprite:
+    # one image or polygon item on a tkinter Canvas, in turtle coordinates
+
+    __slots__ = ('backend', 'item', 'polygon', 'size', 'shape', 'x', 'y', 'heading', 'color', 'visible')
+
+    def __init__(self, backend, shape, size):
+        self.backend = backend
+        self.item = None
+        self.polygon = None  # shape points while the item is a polygon
+        self.size = size
+        self.shape = None
+        self.x = 0.0
+        self.y = 0.0
+        self.heading = 0.0
+        self.color = "black"
+        self.visible = False
+        self.set_shape(shape)
+
+    def set_shape(self, name):
+        if name == self.shape:
+            return
+        backend = self.backend
+        canvas = backend.canvas
+        polygon = POLYGONS.get(name)
+        image = None if polygon is not None else backend.image(name)
+        # an item cannot change between image and polygon, replace it
+        if self.item is None or (polygon is None) != (self.polygon is None):
+            if self.item is not None:
+                canvas.delete(self.item)
+            state = "normal" if self.visible else "hidden"
+            if polygon is None:
+                self.item = canvas.create_image(self.x, -self.y, image=image, state=state)
+            else:
+                self.item = canvas.create_polygon(0, 0, 0, 0, 0, 0, fill=self.color,
+                                                  outline=self.color, state=state)
+            backend.stats.ops += 1
+        elif polygon is None:
+            canvas.itemconfigure(self.item, image=image)
+            backend.stats.ops += 1
+        self.shape = name
+        self.polygon = polygon
+        if polygon is not None:
+            self._place_polygon()
+
+    def _place_polygon(self):
+        # rotate and scale the shape like turtle does, the nose points along the heading
+        cos = math.cos(math.radians(self.heading)) * self.size
+        sin = math.sin(math.radians(self.heading)) * self.size
+        x, y = self.x, self.y
+        points = []
+        for px, py in self.polygon:
+            points.append(x + sin * px + cos * py)
+            points.append(-(y - cos * px + sin * py))
+        self.backend.canvas.coords(self.item, points)
+        self.backend.stats.ops += 1
+
+    def move_to(self, x, y):
+        if x == self.x and y == self.y:
+            return
+        self.x = x
+        self.y = y
+        if self.polygon is None:
+            self.backend.canvas.coords(self.item, x, -y)
+            self.backend.stats.ops += 1
+        else:
+            self._place_polygon()
+
+    def turn_to(self, heading):
+        # images are not rotated, as in turtle
+        if heading != self.heading:
+            self.heading = heading
+            if self.polygon is not None:
+                self._place_polygon()
+
+    def set_color(self, color):
+        if color != self.color:
+            self.color = color
+            if self.polygon is not None:
+                self.backend.canvas.itemconfigure(self.item, fill=color, outline=color)
+                self.backend.stats.ops += 1
+
+    def set_visible(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self.backend.canvas.itemconfigure(self.item, state="normal" if visible else "hidden")
+            self.backend.stats.ops += 1
+
+
+class CanvasText:
+    # one text item, created on first write and edited in place afterwards
+
+    __slots__ = ('backend', 'item', 'x', 'y', 'color', 'font', 'align', 'text')
+
+    def __init__(self, backend, x, y, color, font, align):
+        self.backend = backend
+        self.item = None
+        self.x = x
+        self.y = y
+        self.color = color
+        self.font = font
+        self.align = align
+        self.text = None
+
+    def move_to(self, x, y):
+        if (x, y) != (self.x, self.y):
+            self.x = x
+            self.y = y
+            if self.item is not None:
+                self.backend.canvas.coords(self.item, x - 1, -y)
+                self.backend.stats.ops += 1
+
+    def write_text(self, text):
+        if text == self.text:
+            return
+        canvas = self.backend.canvas
+        if self.item is None:
+            self.item = canvas.create_text(self.x - 1, -self.y, text=text, fill=self.color,
+                                           font=self.font, anchor=TEXT_ANCHORS[self.align])
+        else:
+            canvas.itemconfigure(self.item, text=text)
+        self.text = text
+        self.backend.stats.ops += 1
+
+    def clear_text(self):
+        if self.text:
+            self.backend.canvas.itemconfigure(self.item, text="")
+            self.backend.stats.ops += 1
+        self.text = None if self.item is None else ""
+
+
+class CanvasBackend:
+    # draws straight onto the turtle screen's tkinter Canvas; the canvas
+    # repaints changed items itself, flush() only lets Tk catch up
+
+    name = "canvas"
+
+    def __init__(self, screen):
+        self.canvas = screen.getcanvas()
+        self.stats = RenderStats()
+
+    def image(self, name):
+        return ASSETS.image(name)
+
+    def sprite(self, shape, size=1):
+        return CanvasSprite(self, shape, size)
+
+    def text(self, x, y, color, font, align="left"):
+        return CanvasText(self, x, y, color, font, align)
+
+    def pen(self):
+        return create_base_turtle()
+
+    def flush(self):
+        self.stats.end_frame()
+        self.canvas.update()
+
+
+class NullSprite:
+    # remembers its attributes and counts changes, draws nothing
+
+    __slots__ = ('stats', 'shape', 'x', 'y', 'heading', 'color', 'visible')
+
+    def __init__(self, backend, shape, size):
+        backend.items += 1
+        self.stats = backend.stats
+        self.shape = shape
+        self.x = 0.0
+        self.y = 0.0
+        self.heading = 0.0
+        self.color = None
+        self.visible = False
+
+    def set_shape(self, name):
+        if name != self.shape:
+            self.shape = name
+            self.stats.ops += 1
+
+    def move_to(self, x, y):
+        if x != self.x or y != self.y:
+            self.x = x
+            self.y = y
+            self.stats.ops += 1
+
+    def turn_to(self, heading):
+        if heading != self.heading:
+            self.heading = heading
+            self.stats.ops += 1
+
+    def set_color(self, color):
+        if color != self.color:
+            self.color = color
+            self.stats.ops += 1
+
+    def set_visible(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self.stats.ops += 1
+
+
+class NullText:
+    __slots__ = ('backend', 'x', 'y', 'text')
+
+    def __init__(self, backend, x, y, color, font, align):
+        self.backend = backend
+        self.x = x
+        self.y = y
+        self.text = None
+
+    def move_to(self, x, y):
+        self.x = x
+        self.y = y
+
+    def write_text(self, text):
+        if text != self.text:
+            if self.text is None:
+                self.backend.items += 1
+            self.text = text
+            self.backend.stats.ops += 1
+
+    def clear_text(self):
+        if self.text is not None:
+            self.backend.items -= 1
+            self.text = None
+
+
+class NullPen:
+    # the turtle calls the game over screen makes; counts the items it would leave behind
+
+    __slots__ = ('backend', 'drawn')
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.drawn = 0
+
+    def _draw(self, *args, **kwargs):
+        self.drawn += 1
+        self.backend.items += 1
+
+    write = end_fill = _draw
+
+    def _move(self, *args, **kwargs):
+        pass
+
+    goto = color = begin_fill = forward = left = _move
+
+    def clear(self):
+        self.backend.items -= self.drawn
+        self.drawn = 0
+
+
+class NullBackend:
+    # headless backend: the full Scene runs, nothing reaches Tk
+    #
+    # items counts what a canvas would hold: sprites, written texts and pen drawings
+
+    name = "null"
+
+    def __init__(self, screen=None):
+        self.stats = RenderStats()
+        self.items = 0
+
+    def sprite(self, shape, size=1):
+        return NullSprite(self, shape, size)
+
+    def text(self, x, y, color, font, align="left"):
+        return NullText(self, x, y, color, font, align)
+
+    def pen(self):
+        return NullPen(self)
+
+    def flush(self):
+        self.stats.end_frame()
+
+
+BACKENDS = {"turtle": TurtleBackend, "canvas": CanvasBackend, "null": NullBackend}
+
+
+def create_backend(name, screen=None):
+    # backend by name; every backend but null draws on the turtle screen
+    try:
+        return BACKENDS[name](screen)
+    except KeyError:
+        raise ValueError(f"Unknown renderer '{name}', expected one of: {', '.join(BACKENDS)}") from None
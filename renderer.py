@@ -1,251 +1,373 @@
-# renderer.py
-import turtle as t
-import random as r
-from constants import SCREEN_HEIGHT as SH, SCREEN_WIDTH as SW, GRAVITY as G
-
-
-def create_base_turtle():
-    # factory function for creating base turtle with common settings
-    turtle_obj = t.Turtle()
-    turtle_obj.speed(0)
-    turtle_obj.penup()
-    turtle_obj.hideturtle()
-    return turtle_obj
-
-
-class GeneralPen(t.Turtle):
-    # base turtle class with standardized initialization
-
-    def __init__(self):
-        t.Turtle.__init__(self)
-        self._setup_turtle()
-
-    def _setup_turtle(self):
-        # configure turtle with standard settings
-        self.speed(0)
-        self.penup()
-        self.hideturtle()
-
-
-class Wall(GeneralPen):
-    # wall entity for game boundaries
-
-    def __init__(self, x_position):
-        GeneralPen.__init__(self)
-        self._position_wall(x_position)
-
-    def _position_wall(self, x_coord):
-        # set wall position on screen
-        self.goto(x_coord, 0)
-
-
-class Platform(GeneralPen):
-    # interactive platform objects with varying sizes
-
-    PLATFORM_SHAPES = {
-        12: "plat240.gif",
-        11: "plat220.gif",
-        10: "plat200.gif",
-        9: "plat180.gif",
-        8: "plat160.gif",
-        7: "plat140.gif",
-        6: "plat120.gif",
-        5: "plat100.gif"
-    }
-
-    DEFAULT_SHAPE = "plat.gif"
-
-    def __init__(self, x_coord, y_coord, platform_length):
-        GeneralPen.__init__(self)
-        self._initialize_platform(x_coord, y_coord, platform_length)
-
-    def _initialize_platform(self, x, y, length):
-        # setup platform with position and appearance
-        self.showturtle()
-        self.length = length
-        self.goto(x, y)
-        self.floor_num = 0
-        self._set_platform_shape()
-        self.bonus = None
-
-    def _set_platform_shape(self):
-        # determine platform sprite based on length
-        shape_file = self.PLATFORM_SHAPES.get(self.length, self.DEFAULT_SHAPE)
-        self.shape(shape_file)
-
-
-class Score(GeneralPen):
-    # score tracking and display system
-
-    SCORE_FONT = ("Courier", 32, "bold")
-    GAME_OVER_FONT = ("Courier", 50, "bold")
-    SCORE_COLOR = "ghostwhite"
-    GAME_OVER_COLOR = "crimson"
-
-    def __init__(self):
-        GeneralPen.__init__(self)
-        self._initialize_score_display()
-        self.play_again_button = None  # button added
-
-    def _initialize_score_display(self):
-        # setup initial score display
-        self.score = 0
-        score_x = -SW // 2 + 10
-        score_y = SH // 2 - 60
-        self.goto(score_x, score_y)
-        self.pencolor(self.SCORE_COLOR)
-        self._render_score()
-
-    def _render_score(self):
-        # draw current score on screen
-        score_text = f"Punkty: {self.score}"
-        self.write(score_text, align="left", font=self.SCORE_FONT)
-
-    def update(self, updated_score):
-        # refresh score display with new value
-        self.score = updated_score
-        self.clear()
-        self._render_score()
-
-    def game_over(self, screen, restart_callback):
-        # display final game over screen and show restart button
-        self.goto(0, -50)
-        self.color(self.GAME_OVER_COLOR)
-        final_message = f"Koniec gry!\nKońcowy wynik: {self.score}"
-        self.write(final_message, align="center", font=self.GAME_OVER_FONT)
-
-        # text
-        text = "Zagraj ponownie"
-        BUTTON_FONT = ("Courier", 12, "bold")  # mniejsza czcionka
-
-        text_width_estimate = len(text) * BUTTON_FONT[1] * 0.6
-        padding = 40
-        button_width = int(text_width_estimate + padding)
-        button_height = BUTTON_FONT[1] + 20
-
-        button = t.Turtle()
-        button.hideturtle()
-        button.penup()
-        button.goto(-button_width // 2, -250)
-        button.color("crimson", "lightblue")
-        button.begin_fill()
-        for _ in range(2):
-            button.forward(button_width)
-            button.left(90)
-            button.forward(button_height)
-            button.left(90)
-        button.end_fill()
-
-        button.goto(0, -250 + 10)
-        button.color("crimson")
-        button.write(text, align="center", font=BUTTON_FONT)
-
-        def on_click(x, y):
-            if (-button_width // 2 <= x <= button_width // 2) and (-250 <= y <= -250 + button_height):
-                screen.onclick(None)
-                button.clear()
-                self.clear()
-                restart_callback()
-
-        screen.onclick(on_click)
-
-
-class Star(GeneralPen):
-    # animated star objects with physics
-
-    STAR_COLORS = [
-        "yellow", "cyan", "magenta", "orange",
-        "white", "lightgreen", "red", "indigo"
-    ]
-
-    ROTATION_SPEED = 15
-    STAR_SIZE = 0.5
-
-    def __init__(self, x_position, y_position):
-        GeneralPen.__init__(self)
-        self._configure_star(x_position, y_position)
-
-    def _configure_star(self, x, y):
-        # initialize star appearance and physics
-        self.shape("turtle")
-        self.shapesize(self.STAR_SIZE)
-        self._set_random_color()
-        self.goto(x, y)
-        self._set_random_heading()
-        self.showturtle()
-        self._initialize_physics()
-
-    def _set_random_color(self):
-        # apply random color from predefined palette
-        selected_color = r.choice(self.STAR_COLORS)
-        self.color(selected_color)
-
-    def _set_random_heading(self):
-        # set random initial rotation
-        random_angle = r.randint(0, 360)
-        self.setheading(random_angle)
-
-    def _initialize_physics(self):
-        # setup physics properties
-        self.dy = 0
-        self.angle = self.heading()
-
-    def update(self):
-        # update star position and rotation
-        self._apply_gravity()
-        self._rotate_star()
-        self._update_position()
-
-    def _apply_gravity(self):
-        # apply gravitational force to vertical velocity
-        self.dy -= G
-
-    def _rotate_star(self):
-        # increment rotation angle
-        self.angle += self.ROTATION_SPEED
-        self.setheading(self.angle)
-
-    def _update_position(self):
-        # move star based on current velocity
-        new_y = self.ycor() + self.dy
-        self.goto(self.xcor(), new_y)
-
-
-class Bonus(GeneralPen):
-    # bonus collectible with improved shape handling
-
-    BONUS_SHAPE = "image.gif"  #
-    FALLBACK_SHAPES = ["circle", "square", "triangle"]
-    HITBOX = 20
-    VALUE = 500
-
-    def __init__(self, x_coord, y_coord):
-        super().__init__()
-        self._setup_bonus_shape()
-        self.goto(x_coord, y_coord)
-        self.showturtle()
-
-    def _setup_bonus_shape(self):
-        # setup bonus shape with fallback handling
-        try:
-            # try to use the primary bonus image
-            self.shape(self.BONUS_SHAPE)
-            self.color("gold")  # set color for the image
-        except Exception as e:
-            # if primary shape fails, try fallback shapes
-            print(f"Warning: Could not load bonus shape '{self.BONUS_SHAPE}': {e}")
-            self._use_fallback_shape()
-
-    def _use_fallback_shape(self):
-        # use a fallback shape if primary image is not available
-        try:
-            self.shape("circle")
-            self.color("gold")
-            self.shapesize(0.8)
-            print("Using circle fallback for bonus shape")
-        except Exception as e:
-            # if even basic shapes fail, use turtle default
-            print(f"Warning: Even fallback shapes failed: {e}")
-            self.shape("turtle")
-            self.color("yellow")
-            self.shapesize(0.6)
\ No newline at end of file
+# renderer.py
+import math
+import turtle as t
+from assets import ASSETS, BACKGROUND, BACKGROUND_TILE_HEIGHT
+from constants import SCREEN_HEIGHT as SH, SCREEN_WIDTH as SW
+from pool import Pool
+
+
+def create_base_turtle():
+    # factory function for creating base turtle with common settings
+    turtle_obj = t.Turtle(undobuffersize=0, visible=False)
+    turtle_obj.setundobuffer(None)  # nothing is ever undone
+    turtle_obj.speed(0)
+    turtle_obj.penup()
+    return turtle_obj
+
+
+def hide_sprite(sprite):
+    # release hook for pooled sprites
+    sprite.set_visible(False)
+
+
+class GeneralPen(t.Turtle):
+    # base turtle class with standardized initialization
+    #
+    # a default turtle keeps a 1000 entry undo buffer and draws itself once
+    # when created; sprites never undo and start hidden, so neither is kept
+
+    __slots__ = ()
+
+    def __init__(self):
+        t.Turtle.__init__(self, undobuffersize=0, visible=False)
+        self._setup_turtle()
+
+    def _setup_turtle(self):
+        # configure turtle with standard settings
+        self.setundobuffer(None)  # also skips the undo bookkeeping of every goto
+        self.speed(0)
+        self.penup()
+
+
+class Background:
+    # background image cut into horizontal tiles, repeated upwards and
+    # scrolled at PARALLAX_RATE of the camera speed
+    #
+    # only the tile rows covering the screen have sprites; every frame they
+    # move, and a sprite wrapping past the bottom takes the shape of the next row above
+
+    PARALLAX_RATE = 0.25
+
+    __slots__ = ('tiles', 'tile_height', 'base', 'sprites')
+
+    def __init__(self, backend, tiles=None, tile_height=BACKGROUND_TILE_HEIGHT):
+        if tiles is None:
+            tiles = ASSETS.tile_names(BACKGROUND, tile_height)
+        self.tiles = tiles  # top strip first
+        self.tile_height = tile_height
+        self.base = -len(tiles) * tile_height / 2  # image centred on screen at camera y 0
+        self.sprites = [backend.sprite(tiles[0]) for _ in range(math.ceil(SH / tile_height) + 1)]
+        for sprite in self.sprites:
+            sprite.set_visible(True)
+
+    def sync(self, camera):
+        # place the sprites over tile rows first..first + len(sprites), row 0 being the image bottom
+        height = self.tile_height
+        tiles = self.tiles
+        last = len(tiles) - 1
+        shift = camera.y * self.PARALLAX_RATE
+        bottom = shift - SH / 2 - self.base  # screen bottom in rows from the image bottom, in px
+        first = math.floor(bottom / height)
+        y = self.base + (first + 0.5) * height - shift
+        for row, sprite in enumerate(self.sprites, first):
+            sprite.set_shape(tiles[last - row % len(tiles)])
+            sprite.move_to(0, y)
+            y += height
+
+
+class Platform:
+    # interactive platform objects with varying sizes
+
+    __slots__ = ('length', 'sprite')
+
+    PLATFORM_SHAPES = {
+        12: "plat240.gif",
+        11: "plat220.gif",
+        10: "plat200.gif",
+        9: "plat180.gif",
+        8: "plat160.gif",
+        7: "plat140.gif",
+        6: "plat120.gif",
+        5: "plat100.gif"
+    }
+
+    DEFAULT_SHAPE = "plat.gif"
+
+    def __init__(self, backend, x_coord, y_coord, platform_length):
+        self._initialize_platform(backend, x_coord, y_coord, platform_length)
+
+    def _initialize_platform(self, backend, x, y, length):
+        # setup platform with position and appearance
+        self.length = length
+        self.sprite = backend.sprite(self._platform_shape())
+        self.sprite.move_to(x, y)
+        self.sprite.set_visible(True)
+
+    def _platform_shape(self):
+        # determine platform sprite based on length
+        return self.PLATFORM_SHAPES.get(self.length, self.DEFAULT_SHAPE)
+
+    def sync(self, state, camera):
+        # mirror position and length of a tower.PlatformState
+        if state.length != self.length:
+            self.length = state.length
+            self.sprite.set_shape(self._platform_shape())
+        self.sprite.move_to(state.x, camera.to_screen(state.y))
+
+
+class Score:
+    # score tracking and display system
+
+    __slots__ = ('backend', 'text', 'score', 'message_pen', 'play_again_button')
+
+    SCORE_FONT = ("Courier", 32, "bold")
+    GAME_OVER_FONT = ("Courier", 50, "bold")
+    SCORE_COLOR = "ghostwhite"
+    GAME_OVER_COLOR = "crimson"
+
+    def __init__(self, backend):
+        score_x = -SW // 2 + 10
+        score_y = SH // 2 - 60
+        self.backend = backend
+        self.text = backend.text(score_x, score_y, self.SCORE_COLOR, self.SCORE_FONT)
+        self._initialize_score_display()
+        self.message_pen = None  # game over pens come from the backend on the first game over
+        self.play_again_button = None  # button added
+
+    def _initialize_score_display(self):
+        # setup initial score display
+        self.score = 0
+        self._render_score()
+
+    def reset(self):
+        # back to the in-game score display after a game over
+        self._initialize_score_display()
+
+    def clear(self):
+        self.text.clear_text()
+
+    def _render_score(self):
+        # draw current score on screen, the text item is kept while it does not change
+        score_text = f"Punkty: {self.score}"
+        self.text.write_text(score_text)
+
+    def update(self, updated_score):
+        # refresh score display with new value
+        self.score = updated_score
+        self._render_score()
+
+    def game_over(self, screen, restart_callback, rank=None, total=None):
+        # display final game over screen and show restart button
+        if self.message_pen is None:
+            self.message_pen = self.backend.pen()
+        message = self.message_pen
+        message.goto(0, -50)
+        message.color(self.GAME_OVER_COLOR)
+        final_message = f"Koniec gry!\nKońcowy wynik: {self.score}"
+        if rank is not None:
+            final_message += f"\nMiejsce w rankingu: {rank} z {total}"
+        message.write(final_message, align="center", font=self.GAME_OVER_FONT)
+
+        # text
+        text = "Zagraj ponownie"
+        BUTTON_FONT = ("Courier", 12, "bold")  # mniejsza czcionka
+
+        text_width_estimate = len(text) * BUTTON_FONT[1] * 0.6
+        padding = 40
+        button_width = int(text_width_estimate + padding)
+        button_height = BUTTON_FONT[1] + 20
+
+        # one button pen per score display, reused by every game over
+        if self.play_again_button is None:
+            self.play_again_button = self.backend.pen()
+        button = self.play_again_button
+        button.goto(-button_width // 2, -250)
+        button.color("crimson", "lightblue")
+        button.begin_fill()
+        for _ in range(2):
+            button.forward(button_width)
+            button.left(90)
+            button.forward(button_height)
+            button.left(90)
+        button.end_fill()
+
+        button.goto(0, -250 + 10)
+        button.color("crimson")
+        button.write(text, align="center", font=BUTTON_FONT)
+
+        def on_click(x, y):
+            if (-button_width // 2 <= x <= button_width // 2) and (-250 <= y <= -250 + button_height):
+                screen.onclick(None)
+                button.clear()
+                message.clear()
+                restart_callback()
+
+        screen.onclick(on_click)
+
+
+class ProfilerHud:
+    # per-stage frame timings from a profiler.FrameProfiler, top right next to the score
+
+    HUD_FONT = ("Courier", 9, "normal")
+    HUD_COLOR = "ghostwhite"
+    LINE_HEIGHT = 14
+    REFRESH_FRAMES = 30  # rewriting text is slow, refresh twice a second
+
+    __slots__ = ('text', 'frames')
+
+    def __init__(self, backend):
+        self.text = backend.text(40, SH // 2 - 20, self.HUD_COLOR, self.HUD_FONT)
+        self.frames = 0
+
+    def draw(self, profiler):
+        # redraw the percentile table every REFRESH_FRAMES calls
+        self.frames += 1
+        if self.frames < self.REFRESH_FRAMES:
+            return
+        self.frames = 0
+        lines = [f"{'ms':<21} {'p50':>5} {'p95':>5} {'p99':>5}"]
+        for name, calls, mean, p50, p95, p99, worst in profiler.summary():
+            lines.append(f"{name:<21} {p50:5.2f} {p95:5.2f} {p99:5.2f}")
+        # text is anchored at its bottom left corner
+        self.text.move_to(40, SH // 2 - 20 - len(lines) * self.LINE_HEIGHT)
+        self.text.write_text("\n".join(lines))
+
+    def hide(self):
+        self.text.clear_text()
+        self.frames = self.REFRESH_FRAMES - 1  # draw on the next frame once shown again
+
+
+class StarField:
+    # draws a particles.StarEmitter with pooled star sprites
+
+    __slots__ = ('pool', 'sprites')
+
+    STAR_SHAPE = "turtle"
+    STAR_SIZE = 0.5
+
+    STAR_COLORS = [
+        "yellow", "cyan", "magenta", "orange",
+        "white", "lightgreen", "red", "indigo"
+    ]
+
+    def __init__(self, backend):
+        self.pool = Pool(lambda: backend.sprite(self.STAR_SHAPE, self.STAR_SIZE), hide_sprite)
+        self.sprites = []
+
+    def sync(self, emitter, camera):
+        # mirror live particles onto sprites, return unused sprites to the pool
+        count = emitter.count
+        sprites = self.sprites
+        while len(sprites) < count:
+            sprite = self.pool.acquire()
+            sprite.set_visible(True)
+            sprites.append(sprite)
+        while len(sprites) > count:
+            self.pool.release(sprites.pop())
+
+        x, y, angle, color = emitter.x, emitter.y, emitter.angle, emitter.color
+        camera_y = camera.y
+        for i in range(count):
+            sprite = sprites[i]
+            sprite.set_color(self.STAR_COLORS[color[i]])
+            sprite.turn_to(angle[i])
+            sprite.move_to(x[i], y[i] - camera_y)
+
+
+class Bonus:
+    # bonus collectible with improved shape handling
+
+    __slots__ = ('sprite',)
+
+    BONUS_SHAPE = "image.gif"  #
+    FALLBACK_SHAPES = ["circle", "square", "triangle"]
+
+    def __init__(self, backend):
+        self.sprite = self._setup_bonus_shape(backend)
+
+    def place(self, x_coord, y_coord):
+        # show a pooled bonus at a new position
+        self.sprite.move_to(x_coord, y_coord)
+        self.sprite.set_visible(True)
+
+    def hide(self):
+        # release hook of the bonus pool
+        self.sprite.set_visible(False)
+
+    def sync(self, state, camera):
+        # mirror position of a world.BonusState
+        self.sprite.move_to(state.x, camera.to_screen(state.y))
+
+    def _setup_bonus_shape(self, backend):
+        # setup bonus shape with fallback handling
+        try:
+            # try to use the primary bonus image
+            sprite = backend.sprite(self.BONUS_SHAPE)
+            sprite.set_color("gold")  # set color for the image
+            return sprite
+        except Exception as e:
+            # if primary shape fails, try fallback shapes
+            print(f"Warning: Could not load bonus shape '{self.BONUS_SHAPE}': {e}")
+            return self._use_fallback_shape(backend)
+
+    def _use_fallback_shape(self, backend):
+        # use a fallback shape if primary image is not available
+        try:
+            sprite = backend.sprite("circle", 0.8)
+            sprite.set_color("gold")
+            print("Using circle fallback for bonus shape")
+        except Exception as e:
+            # if even basic shapes fail, use turtle default
+            print(f"Warning: Even fallback shapes failed: {e}")
+            sprite = backend.sprite("turtle", 0.6)
+            sprite.set_color("yellow")
+        return sprite
+
+
+class Scene:
+    # background, platform, star, bonus and score sprites mirroring a world.World,
+    # drawn through one of the render_backends
+
+    def __init__(self, world, backend):
+        self.backend = backend
+        self.background = Background(backend)  # created first, so drawn below everything
+        self.platforms = [Platform(backend, plat.x, world.camera.to_screen(plat.y), plat.length)
+                          for plat in world.platforms]
+        self.stars = StarField(backend)
+        self.bonus_pool = Pool(lambda: Bonus(backend), Bonus.hide)
+        self.score_display = Score(backend)
+        self.profiler_hud = ProfilerHud(backend)
+
+    def reset(self, world):
+        # reuse every sprite for a world that was just reset
+        self.release_removed(world)
+        self.score_display.reset()
+        self.sync(world)
+
+    def release_removed(self, world):
+        # return sprites of bonuses dropped during the last step to the pool
+        for bonus in world.removed:
+            if bonus.sprite is not None:
+                self.bonus_pool.release(bonus.sprite)
+                bonus.sprite = None
+
+    def sync(self, world):
+        # push the current world state to the sprites in screen coordinates
+        camera = world.camera
+        self.background.sync(camera)
+        for sprite, plat in zip(self.platforms, world.platforms):
+            sprite.sync(plat, camera)
+
+        self.stars.sync(world.stars, camera)
+
+        for bonus in world.bonuses:
+            if bonus.sprite is None:
+                bonus.sprite = self.bonus_pool.acquire()
+                bonus.sprite.place(bonus.x, camera.to_screen(bonus.y))
+            else:
+                bonus.sprite.sync(bonus, camera)
+
+        self.score_display.update(world.score)
+
+    def pool_stats(self):
+        return {"stars": self.stars.pool.stats(), "bonuses": self.bonus_pool.stats()}
@@ -0,0 +1,154 @@
+# replay.py
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from world import Inputs, World
+
+# per-frame input logs: one byte per frame, zlib-compressed on disk
+
+LEFT = 1
+RIGHT = 2
+SPACE = 4
+
+MAGIC = b"STRP"
+VERSION = 2  # 2: platform layouts come from levelgen
+HEADER = struct.Struct("<4sBqI")  # magic, version, seed, frame count
+REPLAY_DIR = "replays"
+
+
+def new_seed():
+    # seed for a new session, recorded so the session can be replayed
+    return random.randrange(2 ** 63)
+
+
+class InputLog:
+    # RNG seed plus the inputs of every frame of one game
+
+    __slots__ = ('seed', 'frames')
+
+    def __init__(self, seed, frames=None):
+        self.seed = seed
+        self.frames = bytearray() if frames is None else bytearray(frames)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def record(self, inputs):
+        self.frames.append((LEFT if inputs.left else 0) |
+                           (RIGHT if inputs.right else 0) |
+                           (SPACE if inputs.space else 0))
+
+    def inputs_at(self, frame, inputs):
+        # fill inputs with the state recorded for frame
+        bits = self.frames[frame]
+        inputs.left = bool(bits & LEFT)
+        inputs.right = bool(bits & RIGHT)
+        inputs.space = bool(bits & SPACE)
+        return inputs
+
+    def to_bytes(self):
+        return HEADER.pack(MAGIC, VERSION, self.seed, len(self.frames)) + zlib.compress(self.frames, 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a StudentTower replay file")
+        frames = zlib.decompress(data[HEADER.size:])
+        if len(frames) != count:
+            raise ValueError("Replay file is truncated")
+        return cls(seed, frames)
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as replay:
+            replay.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as replay:
+            return cls.from_bytes(replay.read())
+
+
+def timestamped_path(directory, prefix, extension):
+    # directory/prefix-YYYYmmdd-HHMMSS-mmm.extension; -1, -2, ... is appended
+    # while that name is taken, so files made within a millisecond never collide
+    now = time.time()
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}"
+    base = os.path.join(directory, f"{prefix}-{stamp}")
+    path = f"{base}.{extension}"
+    count = 0
+    while os.path.exists(path):
+        count += 1
+        path = f"{base}-{count}.{extension}"
+    return path
+
+
+def session_path(directory=REPLAY_DIR):
+    # new timestamped file name for a recorded session
+    return timestamped_path(directory, "session", "strp")
+
+
+class Recorder:
+    # input source that passes another source's inputs through and records them
+
+    __slots__ = ('source', 'log')
+
+    def __init__(self, source, log):
+        self.source = source
+        self.log = log
+
+    def next(self):
+        inputs = self.source.next()
+        if inputs is not None:
+            self.log.record(inputs)
+        return inputs
+
+
+class Replayer:
+    # input source that plays a log back; returns None when the log ends
+
+    __slots__ = ('log', 'inputs', 'frame')
+
+    def __init__(self, log):
+        self.log = log
+        self.inputs = Inputs()
+        self.frame = 0
+
+    def next(self):
+        if self.frame >= len(self.log):
+            return None
+        self.log.inputs_at(self.frame, self.inputs)
+        self.frame += 1
+        return self.inputs
+
+
+def replay_headless(log, world=None):
+    # run a whole log at top speed and return the world in its final state
+    if world is None:
+        world = World(log.seed)
+    else:
+        world.reset(log.seed)
+    replayer = Replayer(log)
+    inputs = replayer.next()
+    while inputs is not None and not world.game_over:
+        world.step(inputs)
+        inputs = replayer.next()
+    return world
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python replay.py FILE")
+    log = InputLog.load(sys.argv[1])
+    start = time.perf_counter()
+    world = replay_headless(log)
+    elapsed = time.perf_counter() - start
+    print(f"Frames: {world.frame}/{len(log)}, score: {world.score}, "
+          f"floor: {world.player.highest_floor}, game over: {world.game_over}, "
+          f"{world.frame / elapsed if elapsed else 0:.0f} frames/s")
@@ -0,0 +1,125 @@
+# scheduler.py
+import math
+import time
+from constants import FIXED_TIMESTEP, MAX_CATCHUP_STEPS, MAX_BACKLOG
+
+
+class FrameStats:
+    # running frame-time statistics of a scheduler, times in seconds
+
+    __slots__ = ('frames', 'steps', 'skipped_renders', 'dropped_steps',
+                 'total_time', 'min_time', 'max_time', 'last_time')
+
+    def __init__(self):
+        self.frames = 0
+        self.steps = 0
+        self.skipped_renders = 0
+        self.dropped_steps = 0
+        self.total_time = 0.0
+        self.min_time = float('inf')
+        self.max_time = 0.0
+        self.last_time = 0.0
+
+    def record(self, frame_time):
+        self.frames += 1
+        self.total_time += frame_time
+        self.last_time = frame_time
+        if frame_time < self.min_time:
+            self.min_time = frame_time
+        if frame_time > self.max_time:
+            self.max_time = frame_time
+
+    def mean_time(self):
+        return self.total_time / self.frames if self.frames else 0.0
+
+    def summary(self):
+        # stats as a plain dict, times in milliseconds
+        return {
+            "frames": self.frames,
+            "steps": self.steps,
+            "skipped_renders": self.skipped_renders,
+            "dropped_steps": self.dropped_steps,
+            "mean_ms": self.mean_time() * 1000,
+            "min_ms": (self.min_time if self.frames else 0.0) * 1000,
+            "max_ms": self.max_time * 1000,
+        }
+
+
+class FixedStepScheduler:
+    # fixed physics timestep driven by a one-shot timer (e.g. screen.ontimer)
+    #
+    # update() runs once per timestep and returns False to stop the loop,
+    # render() runs at most once per tick and is skipped while catching up;
+    # a backlog longer than max_backlog seconds is dropped instead of replayed.
+
+    __slots__ = ('timer', 'update', 'render', 'on_stop', 'timestep', 'max_steps',
+                 'max_backlog', 'clock', 'accumulator', 'last_tick', 'running', 'stats', '_tick')
+
+    def __init__(self, timer, update, render, on_stop=None,
+                 timestep=FIXED_TIMESTEP, max_steps=MAX_CATCHUP_STEPS, max_backlog=MAX_BACKLOG,
+                 clock=time.perf_counter):
+        self.timer = timer
+        self.update = update
+        self.render = render
+        self.on_stop = on_stop
+        self.timestep = timestep
+        self.max_steps = max_steps
+        self.max_backlog = max_backlog
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last_tick = 0.0
+        self.running = False
+        self.stats = FrameStats()
+        # bound once so rescheduling does not build a new callable every frame
+        self._tick = self.tick
+
+    def start(self):
+        self.running = True
+        self.accumulator = self.timestep  # run the first step right away
+        self.last_tick = self.clock()
+        self.tick()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self.on_stop is not None:
+            self.on_stop()
+
+    def tick(self):
+        if not self.running:
+            return
+
+        now = self.clock()
+        self.accumulator += now - self.last_tick
+        self.last_tick = now
+
+        timestep = self.timestep
+        stats = self.stats
+        steps = 0
+        while self.accumulator >= timestep and steps < self.max_steps:
+            self.accumulator -= timestep
+            steps += 1
+            if not self.update():
+                stats.steps += steps
+                self.render()
+                self.stop()
+                return
+        stats.steps += steps
+
+        if self.accumulator >= timestep:
+            # behind schedule: skip this render and catch up on the next tick
+            stats.skipped_renders += 1
+            if self.accumulator > self.max_backlog:
+                # too far behind to catch up, drop the excess steps
+                dropped = int((self.accumulator - self.max_backlog) // timestep) + 1
+                stats.dropped_steps += dropped
+                self.accumulator -= dropped * timestep
+        elif steps:
+            self.render()
+
+        stats.record(self.clock() - now)
+
+        # wake up when the next step is due
+        delay = math.ceil((timestep - self.accumulator) * 1000)
+        self.timer(self._tick, max(delay, 0))
@@ -0,0 +1,388 @@
+# snapshots.py
+import argparse
+import os
+import struct
+import tempfile
+import time
+from array import array
+from replay import LEFT, RIGHT, SPACE, timestamped_path
+from world import PLATFORM_COUNT, Inputs, PlayerState
+
+# the last few seconds of world state, one delta-encoded snapshot per frame
+#
+# a snapshot is a fixed vector of doubles (FIELDS). every frame stores only
+# the entries that changed since the frame before plus that frame's inputs;
+# every KEY_INTERVAL frames also the full vector and the random generator
+# states, all in arrays allocated once. any frame's vector is rebuilt from
+# the key frame before it plus the deltas after it; a rewind restores that
+# key frame and steps the recorded inputs forward, which is exact.
+
+SNAPSHOT_FRAMES = 600  # frames kept (10 s at 60 Hz)
+KEY_INTERVAL = 60
+MAX_BONUSES = 32  # bonuses beyond this are not captured
+REWIND_FRAMES = 180  # 3 s
+SNAPSHOT_DIR = "snapshots"
+
+MAGIC = b"STSN"
+VERSION = 1
+HEADER = struct.Struct("<4sBHII")  # magic, version, field count, names length, frames
+
+WORLD_FIELDS = ("frame", "score", "game_over", "camera_y", "levels_x", "levels_length",
+                "platform_head", "bonus_count")
+PLAYER_FIELDS = PlayerState.__slots__
+PLATFORM_FIELDS = ("x", "y", "length", "floor_num")
+FIELDS = (WORLD_FIELDS +
+          tuple(f"player.{name}" for name in PLAYER_FIELDS) +
+          tuple(f"platform{i}.{name}" for i in range(PLATFORM_COUNT) for name in PLATFORM_FIELDS) +
+          tuple(f"bonus{i}.{name}" for i in range(MAX_BONUSES) for name in ("x", "y")))
+PLAYER_START = len(WORLD_FIELDS)
+PLATFORM_START = PLAYER_START + len(PLAYER_FIELDS)
+BONUS_START = PLATFORM_START + PLATFORM_COUNT * len(PLATFORM_FIELDS)
+INT_PLAYER_FIELDS = ("rotation_angle", "spin_dir", "scroll_speed", "scroll_speed_threshold", "highest_floor")
+BOOL_PLAYER_FIELDS = ("can_jump", "scroll_active")
+
+
+class SnapshotRing:
+    # capture() after every world step; state_at(), rewind() and dump() read it back
+
+    def __init__(self, frames=SNAPSHOT_FRAMES, key_interval=KEY_INTERVAL):
+        size = len(FIELDS)
+        self.size = size
+        self.frames = frames
+        self.key_interval = key_interval
+        self.key_slots = frames // key_interval + 2
+        self.current = array('d', bytes(8 * size))
+        self.previous = array('d', bytes(8 * size))
+        self.counts = array('H', bytes(2 * frames))  # changed fields per frame slot
+        self.indices = array('H', bytes(2 * frames * size))
+        self.values = array('d', bytes(8 * frames * size))
+        self.inputs = array('B', bytes(frames))  # replay.LEFT | RIGHT | SPACE bits
+        self.keys = array('d', bytes(8 * self.key_slots * size))
+        self.key_rngs = [None] * self.key_slots  # (world rng, level rng) states of each key frame
+        self.first = 0  # first frame captured since the last clear
+        self.valid_from = 0  # oldest key frame still intact at the last rewind
+        self.newest = -1
+
+    def clear(self):
+        self.newest = -1
+        self.valid_from = 0
+        self.current[:] = array('d', bytes(8 * self.size))
+        self.previous[:] = self.current
+
+    def __len__(self):
+        return 0 if self.newest < 0 else self.newest - self.oldest() + 1
+
+    def oldest(self):
+        # first frame whose state can still be rebuilt: the oldest key frame in the ring;
+        # a rewind moves newest back but not the frames its slots already lost
+        interval = self.key_interval
+        earliest = max(self.first, self.valid_from, self.newest - self.frames + 1)
+        return self.first + -(-(earliest - self.first) // interval) * interval
+
+    def capture(self, world):
+        frame = world.frame
+        fresh = frame != self.newest + 1 or self.newest < 0
+        if fresh:
+            # first capture, or the world was reset or restarted
+            self.clear()
+            self.first = frame
+        v = self.current
+        previous = self.previous
+        player = world.player
+        platforms = world.platforms
+        bonuses = world.bonuses
+        bonus_count = min(bonuses.count, MAX_BONUSES)
+        v[0] = frame
+        v[1] = world.score
+        v[2] = world.game_over
+        v[3] = world.camera.y
+        v[4] = world.levels.x
+        v[5] = world.levels.length
+        v[6] = platforms.head
+        v[7] = bonus_count
+        i = PLAYER_START
+        for name in PLAYER_FIELDS:
+            v[i] = getattr(player, name)
+            i += 1
+        # platforms only change when the ring recycles, which moves its head
+        recycled = fresh or v[6] != previous[6]
+        if recycled:
+            for plat in platforms.slots:
+                v[i] = plat.x
+                v[i + 1] = plat.y
+                v[i + 2] = plat.length
+                v[i + 3] = plat.floor_num
+                i += 4
+        i = BONUS_START
+        xs, ys = bonuses.x, bonuses.y
+        for row in range(bonus_count):
+            v[i] = xs[row]
+            v[i + 1] = ys[row]
+            i += 2
+        end = BONUS_START + 2 * int(previous[7])
+        while i < end:  # bonuses that were removed since the last frame
+            v[i] = 0.0
+            i += 1
+
+        # delta against the previous frame
+        slot = frame % self.frames
+        base = slot * self.size
+        indices, values = self.indices, self.values
+        count = 0
+        for start, stop in ((0, PLATFORM_START), (PLATFORM_START, BONUS_START), (BONUS_START, max(i, end))):
+            if start == PLATFORM_START and not recycled:
+                continue
+            for field in range(start, stop):
+                value = v[field]
+                if value != previous[field]:
+                    indices[base + count] = field
+                    values[base + count] = value
+                    count += 1
+        self.counts[slot] = count
+        inputs = world.inputs
+        self.inputs[slot] = ((LEFT if inputs.left else 0) | (RIGHT if inputs.right else 0) |
+                             (SPACE if inputs.space else 0))
+        if (frame - self.first) % self.key_interval == 0:
+            key = (frame - self.first) // self.key_interval % self.key_slots
+            self.keys[key * self.size:(key + 1) * self.size] = v
+            self.key_rngs[key] = (world.rng.getstate(), world.levels.rng.getstate())
+        previous[:] = v
+        self.newest = frame
+
+    def _key(self, frame):
+        # key frame at or before frame and its slot
+        key_frame = frame - (frame - self.first) % self.key_interval
+        return key_frame, (key_frame - self.first) // self.key_interval % self.key_slots
+
+    def state_at(self, frame):
+        # full snapshot vector of a frame still in the ring
+        if not self.oldest() <= frame <= self.newest:
+            raise IndexError(f"frame {frame} is not in the snapshot ring")
+        size = self.size
+        key_frame, key = self._key(frame)
+        state = self.keys[key * size:(key + 1) * size]
+        indices, values, counts = self.indices, self.values, self.counts
+        for step in range(key_frame + 1, frame + 1):
+            slot = step % self.frames
+            base = slot * size
+            for j in range(base, base + counts[slot]):
+                state[indices[j]] = values[j]
+        return state
+
+    def rewind(self, world, frames=REWIND_FRAMES):
+        # put world back frames frames (as far as the ring reaches), return the frame restored;
+        # the replaced bonuses are handed to the presentation layer through world.removed
+        if self.newest < 0:
+            return world.frame
+        self.valid_from = self.oldest()
+        target = max(self.valid_from, self.newest - frames)
+        key_frame, key = self._key(target)
+        stale = list(world.bonuses)
+        restore_world(world, self.keys[key * self.size:(key + 1) * self.size])
+        world_rng, level_rng = self.key_rngs[key]
+        world.rng.setstate(world_rng)
+        world.levels.rng.setstate(level_rng)
+        inputs = Inputs()
+        for frame in range(key_frame + 1, target + 1):
+            bits = self.inputs[frame % self.frames]
+            inputs.left = bool(bits & LEFT)
+            inputs.right = bool(bits & RIGHT)
+            inputs.space = bool(bits & SPACE)
+            world.step(inputs)
+        world.removed.extend(stale)
+        self.newest = target
+        self.previous[:] = self.current[:] = self.state_at(target)
+        return target
+
+    def dump(self, path):
+        # every frame still in the ring: field names, the oldest full state, then deltas
+        count = len(self)
+        first = self.newest - count + 1
+        names = "\n".join(FIELDS).encode()
+        with open(path, "wb") as output:
+            output.write(HEADER.pack(MAGIC, VERSION, self.size, len(names), count))
+            output.write(names)
+            if not count:
+                return
+            output.write(self.state_at(first).tobytes())
+            size = self.size
+            for frame in range(first + 1, self.newest + 1):
+                slot = frame % self.frames
+                base = slot * size
+                changed = self.counts[slot]
+                output.write(struct.pack("<H", changed))
+                output.write(self.indices[base:base + changed].tobytes())
+                output.write(self.values[base:base + changed].tobytes())
+
+
+def restore_world(world, state):
+    # write a snapshot vector back into world; stars are cleared, bonuses recreated
+    world.frame = int(state[0])
+    world.score = int(state[1])
+    world.game_over = bool(state[2])
+    world.camera.y = state[3]
+    world.levels.x = int(state[4])
+    world.levels.length = int(state[5])
+    platforms = world.platforms
+    platforms.head = int(state[6])
+
+    player = world.player
+    i = PLAYER_START
+    for name in PLAYER_FIELDS:
+        value = state[i]
+        if name in INT_PLAYER_FIELDS:
+            value = int(value)
+        elif name in BOOL_PLAYER_FIELDS:
+            value = bool(value)
+        setattr(player, name, value)
+        i += 1
+    for plat in platforms.slots:
+        plat.x = state[i]
+        plat.y = state[i + 1]
+        plat.length = int(state[i + 2])
+        plat.floor_num = int(state[i + 3])
+        i += 4
+
+    world.events.clear()
+    world.spawned.clear()
+    world.bonuses.clear()
+    for _ in range(int(state[7])):
+        world.add_bonus(state[i], state[i + 1])
+        i += 2
+    world.stars.clear()
+
+
+def load_dump(path):
+    # (field names, [snapshot vector of every frame]) of a dump file
+    with open(path, "rb") as source:
+        data = source.read()
+    magic, version, size, names_length, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a StudentTower snapshot dump")
+    position = HEADER.size
+    names = data[position:position + names_length].decode().split("\n")
+    position += names_length
+    states = []
+    if count:
+        state = array('d', data[position:position + 8 * size])
+        position += 8 * size
+        states.append(state)
+        for _ in range(count - 1):
+            changed, = struct.unpack_from("<H", data, position)
+            position += 2
+            indices = array('H', data[position:position + 2 * changed])
+            position += 2 * changed
+            values = array('d', data[position:position + 8 * changed])
+            position += 8 * changed
+            state = array('d', state)
+            for index, value in zip(indices, values):
+                state[index] = value
+            states.append(state)
+    return names, states
+
+
+def snapshot_path(reason, directory=SNAPSHOT_DIR):
+    # new timestamped dump file name, reason is e.g. "gameover" or "crash"
+    return timestamped_path(directory, reason, "stsn")
+
+
+SNAPSHOTS = SnapshotRing()
+
+
+def dump_snapshots(reason):
+    # write the ring to a new file in SNAPSHOT_DIR and return its path
+    path = snapshot_path(reason)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    SNAPSHOTS.dump(path)
+    return path
+
+
+def world_state(world):
+    # snapshot vector and random generator states of a world, for comparisons
+    ring = SnapshotRing(1, 1)
+    ring.capture(world)
+    return ring.current, world.rng.getstate(), world.levels.rng.getstate()
+
+
+def self_check(frames=2000, seed=0, rewinds=5):
+    # capture a bot game, rewind it a few times in a row, check every rewound
+    # world against a fresh replay and that the replayed future is unchanged
+    from bot import BeamBot
+    from world import World
+    world = World(seed)
+    ring = SnapshotRing()
+    bot = BeamBot(world, budget=None)
+    inputs = []
+    capture_time = 0.0
+    while world.frame < frames and not world.game_over:
+        step_inputs = bot.next()
+        inputs.append((step_inputs.left, step_inputs.right, step_inputs.space))
+        world.step(step_inputs)
+        start = time.perf_counter()
+        ring.capture(world)
+        capture_time += time.perf_counter() - start
+    final = (world.frame, world.score, world.player.x, world.player.y, world.camera.y)
+
+    expected = ring.state_at(ring.newest - REWIND_FRAMES)
+    bound = ring.oldest()
+    newest = ring.newest
+    for i in range(rewinds):
+        target = ring.rewind(world)
+        # never further back than the ring reached before the first rewind
+        assert target == max(bound, newest - REWIND_FRAMES) and ring.oldest() == bound, (target, bound, newest)
+        assert world.frame == target and (i or ring.state_at(target) == expected)
+        fresh = World(seed)
+        fresh_inputs = Inputs()
+        while fresh.frame < target:
+            fresh_inputs.left, fresh_inputs.right, fresh_inputs.space = inputs[fresh.frame]
+            fresh.step(fresh_inputs)
+        assert world_state(world) == world_state(fresh), f"rewind to frame {target} differs from a fresh replay"
+        newest = target
+    replay_inputs = Inputs()
+    while world.frame < final[0]:
+        replay_inputs.left, replay_inputs.right, replay_inputs.space = inputs[world.frame]
+        world.step(replay_inputs)
+        ring.capture(world)
+    assert (world.frame, world.score, world.player.x, world.player.y, world.camera.y) == final, \
+        "rewound game diverged"
+
+    # a dump holds every frame the ring still has
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "check.stsn")
+        ring.dump(path)
+        names, states = load_dump(path)
+    assert names == list(FIELDS) and len(states) == len(ring)
+    assert states[-1] == ring.state_at(ring.newest)
+    return world.frame, capture_time / world.frame * 1e6, target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a snapshot dump, or self-check the snapshot ring")
+    parser.add_argument("file", nargs="?", help="dump written at game over or after a crash")
+    parser.add_argument("--frame", type=int, help="print every field of this frame")
+    parser.add_argument("--fields", default="frame,score,player.x,player.y,player.dy,player.can_jump,camera_y",
+                        help="comma separated fields listed per frame")
+    args = parser.parse_args()
+
+    if args.file is None:
+        frames, capture_us, target = self_check()
+        print(f"Snapshot ring ok: {frames} frames, {capture_us:.1f} us per capture, "
+              f"rewound to frame {target} in steps and replayed identically")
+        return
+    names, states = load_dump(args.file)
+    print(f"{args.file}: {len(states)} frames, {len(names)} fields, {os.path.getsize(args.file)} bytes")
+    if args.frame is not None:
+        state = next((state for state in states if state[0] == args.frame), None)
+        if state is None:
+            raise SystemExit(f"frame {args.frame} is not in the dump")
+        for name, value in zip(names, state):
+            print(f"  {name:<28}{value:g}")
+        return
+    columns = [names.index(name) for name in args.fields.split(",")]
+    print("  " + "".join(f"{names[column]:>16}" for column in columns))
+    for state in states:
+        print("  " + "".join(f"{state[column]:>16g}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# soak.py
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import resource
+import sys
+import tempfile
+from constants import FIXED_TIMESTEP, SCREEN_HEIGHT
+from renderer import Scene
+from render_backends import BACKENDS, create_backend
+from actors import Player
+from highscores import HIGHSCORES
+from input_queue import KEYS
+from world import World
+from main import bind_controls, init_screen, register_assets, restart_game
+
+# restart soak: many games in a row must not grow the canvas or the process
+#
+# with --renderer null it runs without a display: the null backend counts the
+# items a canvas would hold and the screen's key bindings go nowhere
+
+RESTARTS = 1000
+FRAMES_PER_GAME = 120
+WARMUP_RESTARTS = 20
+MAX_ITEM_GROWTH = 0.05  # fraction of unpooled canvas items after warmup
+MAX_OBJECT_GROWTH = 0.05  # fraction of Python objects tracked by the collector after warmup
+MAX_RSS_GROWTH = 8 * 1024 * 1024  # bytes
+PLAY_AGAIN_Y = -240  # inside the button Score.game_over draws
+
+
+def canvas_items(screen, scene):
+    # items on the canvas, or the items the null backend would have drawn, less
+    # the pooled sprites: pools only grow to the most sprites a game needed at once
+    if screen.screen is None:
+        items = scene.backend.items
+    else:
+        items = len(screen.getcanvas().find_all())
+    return items - sum(pool["created"] for pool in scene.pool_stats().values())
+
+
+def live_objects():
+    gc.collect()
+    return len(gc.get_objects())
+
+
+def rss_bytes():
+    # current resident set size; peak size where /proc is not available
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def ignore(*args, **kwargs):
+    pass
+
+
+class SoakScreen:
+    # the real screen, except that timers and clicks are collected so the soak
+    # can fire them itself instead of waiting for Tk's event loop; with no
+    # screen every other call is ignored
+
+    def __init__(self, screen=None):
+        self.screen = screen
+        self.timers = []
+        self.click = None
+
+    def ontimer(self, callback, delay=0):
+        self.timers.append(callback)
+
+    def onclick(self, callback, btn=1, add=None):
+        self.click = callback
+
+    def __getattr__(self, name):
+        if self.screen is None:
+            return ignore
+        return getattr(self.screen, name)
+
+
+class SimulatedClock:
+    # stands in for time.perf_counter; advanced one timestep per scheduler tick
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def play_game(screen, world, player, clock, rng, frames):
+    # run the scheduler ticks of one game with random key events until it ends;
+    # after frames steps the player is dropped below the screen to end it
+    events = player.events
+    keys = sorted(set(KEYS.values()))
+    while screen.timers:
+        tick = screen.timers.pop(0)
+        scheduler = tick.__self__  # every game gets its own scheduler
+        if scheduler.clock is not clock:
+            scheduler.clock = clock
+            scheduler.last_tick = clock.now
+        clock.now += FIXED_TIMESTEP
+        for key in keys:
+            if rng.random() < 0.3:
+                events.push(key, rng.random() < 0.5)
+        if world.frame >= frames:
+            world.player.y = world.camera.bottom - SCREEN_HEIGHT
+        tick()
+
+
+def soak(restarts=RESTARTS, frames=FRAMES_PER_GAME, renderer="turtle"):
+    # every game goes through the real restart path: game_loop with a new
+    # scheduler and key bindings, Score.game_over and its play again button
+    if renderer == "null":
+        screen = SoakScreen()
+    else:
+        screen = SoakScreen(init_screen())
+        register_assets(screen.screen)
+    world = World(0)
+    backend = create_backend(renderer, screen.screen)
+    scene = Scene(world, backend)
+    player = Player(backend, world.player.x, world.player.y)
+    bind_controls(screen, player)
+    clock = SimulatedClock()
+    rng = random.Random(0)
+
+    baseline = None
+    # session logs, snapshot dumps and the leaderboard go to a scratch directory
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        os.chdir(directory)
+        HIGHSCORES.open()
+        try:
+            restart_game(screen, world, player, scene)
+            for i in range(restarts):
+                play_game(screen, world, player, clock, rng, frames)
+                if screen.click is None:
+                    raise RuntimeError("game ended without the play again button")
+                # click the play again button, which starts the next game
+                click, screen.click = screen.click, None
+                click(0, PLAY_AGAIN_Y)
+                if not screen.timers:
+                    raise RuntimeError(f"the play again click at y={PLAY_AGAIN_Y} did not start a new game")
+                if i + 1 == WARMUP_RESTARTS:
+                    baseline = (canvas_items(screen, scene), live_objects(), rss_bytes())
+        finally:
+            HIGHSCORES.close()
+            os.chdir(cwd)
+
+    items, objects, rss = canvas_items(screen, scene), live_objects(), rss_bytes()
+    base_items, base_objects, base_rss = baseline if baseline is not None else (items, objects, rss)
+    print(f"Restarts: {restarts} ({renderer}), unpooled canvas items: {base_items} -> {items}, "
+          f"objects: {base_objects} -> {objects}, "
+          f"RSS: {base_rss / 2 ** 20:.1f} MB -> {rss / 2 ** 20:.1f} MB")
+
+    ok = True
+    if items > base_items * (1 + MAX_ITEM_GROWTH):
+        print("FAIL: canvas item count keeps growing")
+        ok = False
+    if objects > base_objects * (1 + MAX_OBJECT_GROWTH):
+        print("FAIL: Python object count keeps growing")
+        ok = False
+    if rss - base_rss > MAX_RSS_GROWTH:
+        print("FAIL: resident memory keeps growing")
+        ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Restart the game many times and check nothing leaks")
+    parser.add_argument("restarts", nargs="?", type=int, default=RESTARTS)
+    parser.add_argument("--frames", type=int, default=FRAMES_PER_GAME, help="steps per game")
+    parser.add_argument("--renderer", choices=list(BACKENDS), default="turtle",
+                        help="turtle and canvas need a display, null runs headless")
+    args = parser.parse_args()
+    return 0 if soak(args.restarts, args.frames, args.renderer) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# sweep.py
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+import constants
+import levelgen
+import world
+from bot import BeamBot
+from world import Inputs, World
+
+# parameter sweeps: many headless games per setting on a process pool,
+# every finished game is appended to one JSON Lines file
+
+# tunable values and the modules that read them at run time
+PARAMETERS = ("GRAVITY", "FRICTION", "AIR_FRICTION", "JUMP_FACTOR",
+              "MAX_SCROLL_SPEED", "BONUS_ODDS", "SCROLL_SPEED_STEP")
+MODULES = (constants, world, levelgen)
+DEFAULTS = {name: next(getattr(module, name) for module in MODULES if hasattr(module, name))
+            for name in PARAMETERS}
+
+GAMES = 8
+MAX_FRAMES = 3600  # one minute of play per game at most
+
+
+class RandomPlayer:
+    # cheap input source: random key presses, as in the soak test
+
+    __slots__ = ('rng', 'inputs')
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.inputs = Inputs()
+
+    def next(self):
+        inputs = self.inputs
+        inputs.left = self.rng.random() < 0.3
+        inputs.right = self.rng.random() < 0.5
+        inputs.space = self.rng.random() < 0.4
+        return inputs
+
+
+def apply_settings(settings):
+    # defaults overridden by settings, in every module that reads them
+    for name, value in {**DEFAULTS, **settings}.items():
+        for module in MODULES:
+            if hasattr(module, name):
+                setattr(module, name, value)
+    # the jump envelope depends on the physics constants
+    levelgen.REACH = levelgen.reach_envelope(list(levelgen.REACH))
+
+
+def run_game(task):
+    # one headless game of a setting; runs in a worker process
+    setting, settings, seed, frames, player = task
+    apply_settings(settings)
+    game = World(seed)
+    source = BeamBot(game, budget=None) if player == "bot" else RandomPlayer(seed)
+
+    clock = time.perf_counter
+    step_time = 0.0
+    while game.frame < frames and not game.game_over:
+        inputs = source.next()
+        start = clock()
+        game.step(inputs)
+        step_time += clock() - start
+
+    result = {
+        "setting": setting,
+        **settings,
+        "seed": seed,
+        "floor": game.player.highest_floor,
+        "score": game.score,
+        "frames": game.frame,
+        "survived_s": round(game.frame / constants.PHYSICS_HZ, 2),
+        "game_over": game.game_over,
+        "step_us": round(step_time / game.frame * 1e6, 3) if game.frame else 0.0,
+    }
+    if player == "bot":
+        result["plan_ms"] = round(source.stats.summary()["mean_ms"], 3)
+    return result
+
+
+def parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_assignment(text, parser):
+    # "NAME=VALUES" with NAME one of PARAMETERS
+    name, sep, values = text.partition("=")
+    if not sep or name not in PARAMETERS:
+        parser.error(f"expected NAME=VALUES with NAME one of {', '.join(PARAMETERS)}, got '{text}'")
+    return name, values
+
+
+def build_settings(grid, samples, count, rng):
+    # grid: {name: [values]}, samples: {name: (low, high)}; every grid point
+    # is combined with count random draws of the sampled parameters
+    names = list(grid)
+    points = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    if not samples:
+        return points
+    settings = []
+    for point in points:
+        for _ in range(count):
+            drawn = dict(point)
+            for name, (low, high) in samples.items():
+                if isinstance(low, int) and isinstance(high, int):
+                    drawn[name] = rng.randint(low, high)
+                else:
+                    drawn[name] = round(rng.uniform(low, high), 4)
+            settings.append(drawn)
+    return settings
+
+
+def summarize(results):
+    # mean floor and survival per setting, best first
+    by_setting = {}
+    for result in results:
+        by_setting.setdefault(result["setting"], []).append(result)
+    rows = []
+    for setting, games in by_setting.items():
+        params = {name: games[0][name] for name in PARAMETERS if name in games[0]}
+        rows.append((sum(game["floor"] for game in games) / len(games),
+                     sum(game["survived_s"] for game in games) / len(games),
+                     setting, params))
+    rows.sort(key=lambda row: row[0], reverse=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless games over a grid or random sample of game constants")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="values tried for a parameter; repeat for a product grid")
+    parser.add_argument("--sample", action="append", default=[], metavar="NAME=LOW:HIGH",
+                        help="uniform range for a parameter, drawn --samples times")
+    parser.add_argument("--samples", type=int, default=20, help="random draws per grid point")
+    parser.add_argument("--games", type=int, default=GAMES, help="games (seeds) per setting")
+    parser.add_argument("--frames", type=int, default=MAX_FRAMES, help="frame limit per game")
+    parser.add_argument("--player", choices=["bot", "random"], default="bot")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random sample and first game seed")
+    parser.add_argument("--output", default="sweep.jsonl", help="results, one JSON object per game")
+    args = parser.parse_args()
+
+    grid = {}
+    for text in args.grid:
+        name, values = parse_assignment(text, parser)
+        grid[name] = [parse_value(value) for value in values.split(",")]
+    samples = {}
+    for text in args.sample:
+        name, values = parse_assignment(text, parser)
+        low, sep, high = values.partition(":")
+        if not sep:
+            parser.error(f"expected NAME=LOW:HIGH, got '{text}'")
+        samples[name] = (parse_value(low), parse_value(high))
+
+    settings = build_settings(grid, samples, args.samples, random.Random(args.seed))
+    tasks = [(i, setting, args.seed + game, args.frames, args.player)
+             for i, setting in enumerate(settings) for game in range(args.games)]
+    print(f"{len(settings)} settings x {args.games} games on {args.workers} workers -> {args.output}")
+
+    results = []
+    start = time.perf_counter()
+    with open(args.output, "w") as output, multiprocessing.Pool(args.workers) as pool:
+        for done, result in enumerate(pool.imap_unordered(run_game, tasks), 1):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            results.append(result)
+            if done % max(1, len(tasks) // 20) == 0 or done == len(tasks):
+                print(f"  {done}/{len(tasks)} games, {time.perf_counter() - start:.0f} s")
+
+    print("Best settings (mean floor, mean survival):")
+    for floor, survived, setting, params in summarize(results)[:10]:
+        values = ", ".join(f"{name}={value}" for name, value in params.items()) or "defaults"
+        print(f"  #{setting}: floor {floor:.1f}, {survived:.1f} s  {values}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
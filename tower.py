@@ -0,0 +1,98 @@
+# tower.py
+import math
+from constants import PLATFORM_GAP, PLAT_HALF_SIZE, PLAYER_COLLISION_TOLERANCE
+
+
+class PlatformState:
+    # platform record; length is in turtle shape units (20 px)
+
+    __slots__ = ('x', 'y', 'length', 'floor_num')
+
+    def __init__(self, x, y, length, floor_num=0):
+        self.x = x
+        self.y = y
+        self.length = length
+        self.floor_num = floor_num
+
+
+class PlatformRing:
+    # platforms of consecutive floors kept in a ring indexed by floor number
+    #
+    # floor f lives in slot f % size and sits exactly PLATFORM_GAP above
+    # floor f - 1, so floor lookups by height are computed instead of searched.
+
+    __slots__ = ('slots', 'size', 'head')
+
+    def __init__(self, platforms):
+        # platforms must be ordered by floor, starting at floor 0
+        self.slots = list(platforms)
+        self.size = len(self.slots)
+        self.head = 0  # lowest floor still in the tower
+
+    def __iter__(self):
+        # platforms in slot order, which is stable across recycling
+        return iter(self.slots)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def lowest(self):
+        return self.slots[self.head % self.size]
+
+    @property
+    def top_floor(self):
+        return self.head + self.size - 1
+
+    def get(self, floor):
+        # platform of the given floor or None when it is not in the ring
+        if self.head <= floor < self.head + self.size:
+            return self.slots[floor % self.size]
+        return None
+
+    def floor_y(self, floor):
+        return self.lowest.y + (floor - self.head) * PLATFORM_GAP
+
+    def floors_between(self, low_y, high_y):
+        # range of floors whose platform y may lie in [low_y, high_y]
+        base_y = self.lowest.y
+        first = max(self.head, math.floor((low_y - base_y) / PLATFORM_GAP) + self.head)
+        last = min(self.top_floor, math.ceil((high_y - base_y) / PLATFORM_GAP) + self.head)
+        return range(first, last + 1)
+
+    def highest_floor_below(self, y):
+        # highest floor whose platform top is at or below y, or -1
+        base_y = self.lowest.y
+        floor = math.floor((y - PLAT_HALF_SIZE - base_y) / PLATFORM_GAP) + self.head
+        floor = min(floor + 1, self.top_floor)
+        # settle float rounding against the exact top comparison
+        while floor >= self.head and self.slots[floor % self.size].y + PLAT_HALF_SIZE > y:
+            floor -= 1
+        return floor if floor >= self.head else -1
+
+    def find_landing(self, x, bottom, tolerance):
+        # platform under a player with feet at bottom, within tolerance, or None
+        for floor in self.floors_between(bottom - tolerance - PLAT_HALF_SIZE,
+                                         bottom + tolerance - PLAT_HALF_SIZE):
+            plat = self.slots[floor % self.size]
+            plat_half_length = plat.length * 10
+            plat_x = plat.x
+            if (plat_x - plat_half_length - PLAYER_COLLISION_TOLERANCE <= x <=
+                    plat_x + plat_half_length + PLAYER_COLLISION_TOLERANCE and
+                    abs(bottom - (plat.y + PLAT_HALF_SIZE)) <= tolerance):
+                return plat
+        return None
+
+    def recycle(self, bottom_y, place):
+        # move platforms below bottom_y to the top; place(plat) picks the new x
+        size = self.size
+        recycled = 0
+        while self.lowest.y + PLAT_HALF_SIZE < bottom_y:
+            top = self.slots[(self.head + size - 1) % size]
+            plat = self.lowest
+            plat.floor_num = self.head + size
+            plat.y = top.y + PLATFORM_GAP
+            place(plat)
+            self.head += 1
+            recycled += 1
+        return recycled
@@ -0,0 +1,356 @@
+# world.py
+import random
+from entities import EntityStore
+from particles import StarEmitter, STAR_COLOR_COUNT
+from tower import PlatformState, PlatformRing
+from camera import Camera
+from levelgen import LevelGenerator
+from constants import (ACCELERATION, JUMP_DISTANCE, JUMP_FACTOR, GRAVITY, FRICTION,
+                       WALL_BOUNCE_FACTOR, MAX_SPEED, ROTATION_SPEED, PLAYER_HALF_SIZE,
+                       WALL_HALF_SIZE, AIR_FRICTION, TURN_ACCELERATION, NEG_MAX_SPEED, CELEBRATION_THRESHOLD,
+                       SCROLL_THRESHOLD, FAST_SCROLL_SPEED, FAST_SCROLL_Y, MAX_SCROLL_SPEED,
+                       WALL_PIXEL_SIZE, GROUND_Y, PLAYER_START_Y, FLOOR_SHAPE_LENGTH,
+                       HALF_PLAT_SIZE, HALF_SCREEN_HEIGHT,
+                       HALF_SCREEN_WIDTH, HALF_PLAYER_SIZE, PLATFORM_GAP)
+
+# pure-python game state in fixed world coordinates; turtle classes only
+# mirror these records through the world camera
+
+PLATFORM_COUNT = 31
+BONUS_HITBOX = 20
+BONUS_VALUE = 500
+BONUS_ODDS = 300  # a bonus spawns on 1 in BONUS_ODDS frames
+SCROLL_SPEED_STEP = 3000  # points between scroll speed increases
+BONUS_COLUMNS = (("x", 'd'), ("y", 'd'))
+
+# events reported by World.step for the presentation layer
+EVENT_JUMP = "jump"
+EVENT_CELEBRATE = "celebrate"
+EVENT_BONUS_SPAWNED = "bonus_spawned"
+EVENT_BONUS_COLLECTED = "bonus_collected"
+
+
+class Inputs:
+    # keyboard state sampled once per frame
+
+    __slots__ = ('left', 'right', 'space')
+
+    def __init__(self, left=False, right=False, space=False):
+        self.left = left
+        self.right = right
+        self.space = space
+
+
+class PlayerState:
+    # player physics and progression state
+
+    __slots__ = ('x', 'y', 'dx', 'dy', 'can_jump', 'last_dy', 'rotation_angle', 'spin_dir',
+                 'scroll_active', 'scroll_speed', 'scroll_speed_threshold', 'highest_floor')
+
+    def __init__(self, x, y):
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        # back to the standing start at (x, y)
+        self.x = x
+        self.y = y
+        self.dx = self.dy = 0
+        self.can_jump = True
+        self.last_dy = 0
+        self.rotation_angle = 0
+        self.spin_dir = 1
+        self.scroll_active = False
+        self.scroll_speed = 1
+        self.scroll_speed_threshold = SCROLL_SPEED_STEP
+        self.highest_floor = 0
+
+
+class WallState:
+    # vertical wall spanning the whole tower, only x takes part in collisions
+
+    __slots__ = ('x',)
+
+    def __init__(self, x):
+        self.x = x
+
+
+class BonusState:
+    # collectible bonus; sprite is attached by the presentation layer
+
+    __slots__ = ('x', 'y', 'sprite')
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.sprite = None
+
+
+def step_player(player, inputs, platforms, walls, events):
+    # movement rules of a single player for one frame; platforms is a PlatformRing
+    dx = player.dx
+
+    if inputs.right:
+        dx += TURN_ACCELERATION if dx < 0 else ACCELERATION
+    if inputs.left:
+        dx -= TURN_ACCELERATION if dx > 0 else ACCELERATION
+
+    if inputs.space and player.can_jump:
+        events.append(EVENT_JUMP)
+        player.dy = JUMP_DISTANCE + abs(dx) * JUMP_FACTOR
+        player.can_jump = False
+        player.spin_dir = 1 if dx >= 0 else -1
+
+    dy = player.dy
+
+    # gravity
+    if not player.can_jump:
+        dy -= GRAVITY
+        dx *= AIR_FRICTION
+    elif not (inputs.right or inputs.left):
+        dx *= FRICTION
+
+    # speed limits
+    dx = min(MAX_SPEED, max(NEG_MAX_SPEED, dx))
+
+    current_x = player.x
+    current_y = player.y
+
+    next_x = current_x + dx
+    player_left = next_x - PLAYER_HALF_SIZE
+    player_right = next_x + PLAYER_HALF_SIZE
+
+    for wall in walls:
+        wall_x = wall.x
+        if player_right > wall_x - WALL_HALF_SIZE and current_x < wall_x:
+            dx = -abs(dx) * WALL_BOUNCE_FACTOR
+            dy += abs(dx) * WALL_BOUNCE_FACTOR
+        elif player_left < wall_x + WALL_HALF_SIZE and current_x > wall_x:
+            dx = abs(dx) * WALL_BOUNCE_FACTOR
+            dy += abs(dx) * WALL_BOUNCE_FACTOR
+
+    if dy <= 0 and platforms.find_landing(current_x, current_y - PLAYER_HALF_SIZE, max(1, -dy)):
+        dy = 0
+        player.can_jump = True
+    else:
+        player.can_jump = False
+
+    # apply movement threshold
+    if abs(dx) < 0.1:
+        dx = 0
+
+    player.x = current_x + dx
+    player.y = current_y + dy
+    player.dx = dx
+    player.dy = dy
+
+    if player.last_dy <= CELEBRATION_THRESHOLD < dy:
+        events.append(EVENT_CELEBRATE)
+    player.last_dy = dy
+
+    # airborne spinning
+    if not player.can_jump and dx != 0:
+        player.rotation_angle = (player.rotation_angle + ROTATION_SPEED * player.spin_dir) % 360
+    else:
+        player.rotation_angle = 0
+
+
+def create_platforms(levels):
+    # ring of PLATFORM_COUNT platforms with the first floors of a levelgen.LevelGenerator
+    platforms = PlatformRing(PlatformState(0, 0, 0) for _ in range(PLATFORM_COUNT))
+    layout_platforms(platforms, levels)
+    return platforms
+
+
+def layout_platforms(platforms, levels):
+    # ground floor plus the next generated floors, reusing the ring's records
+    platforms.head = 0
+    ground = platforms.slots[0]
+    ground.x, ground.y, ground.length, ground.floor_num = 0, GROUND_Y, FLOOR_SHAPE_LENGTH, 0
+
+    for i in range(1, platforms.size):
+        plat = platforms.slots[i]
+        levels.place(plat)
+        plat.y = GROUND_Y + i * PLATFORM_GAP
+        plat.floor_num = i
+
+
+class World:
+    # complete game state with a turtle-free step function
+
+    # per-frame stages in the order step() runs them, for instrumentation
+    STAGES = ("update_player", "update_stars", "scroll_world",
+              "spawn_bonus", "check_bonus_collision", "update_score")
+
+    __slots__ = ('rng', 'levels', 'camera', 'player', 'platforms', 'walls', 'bonuses', 'stars',
+                 'score', 'frame', 'game_over', 'inputs', 'events', 'spawned', 'removed')
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        # the layout has its own stream so bonuses and stars do not shift it
+        self.levels = LevelGenerator(self.rng.getrandbits(64))
+        self.camera = Camera()
+        self.walls = [
+            WallState(HALF_SCREEN_WIDTH - WALL_PIXEL_SIZE),
+            WallState(-HALF_SCREEN_WIDTH + WALL_PIXEL_SIZE)
+        ]
+        self.platforms = create_platforms(self.levels)
+        self.player = PlayerState(0, PLAYER_START_Y)
+        self.bonuses = EntityStore(BONUS_COLUMNS, items=True)  # items are the BonusState records
+        self.stars = StarEmitter()
+        self.score = 0
+        self.frame = 0
+        self.game_over = False
+        self.inputs = Inputs()
+        # per-step output: event names, bonus records that were added and that were dropped
+        self.events = []
+        self.spawned = []
+        self.removed = []
+
+    def reset(self, seed=None):
+        # start a new game in place with a fresh layout, keeping every container
+        self.rng.seed(seed)
+        self.levels.reset(self.rng.getrandbits(64))
+        self.camera.y = 0
+        layout_platforms(self.platforms, self.levels)
+        self.player.reset(0, PLAYER_START_Y)
+        self.stars.clear()
+        self.score = 0
+        self.frame = 0
+        self.game_over = False
+
+        # hand leftover bonuses to the presentation layer like any other removal
+        self.events.clear()
+        self.spawned.clear()
+        self.removed.clear()
+        self.removed.extend(self.bonuses)
+        self.bonuses.clear()
+
+    def step(self, inputs):
+        # advance the world by one frame
+        self.begin_step(inputs)
+
+        self.update_player()
+        self.update_stars()
+        self.scroll_world()
+        self.spawn_bonus()
+        self.check_bonus_collision()
+        self.update_score()
+
+        self.end_step()
+
+    def begin_step(self, inputs):
+        # per-step bookkeeping before the stages run
+        self.inputs = inputs
+        self.events.clear()
+        self.spawned.clear()
+        self.removed.clear()
+
+    def end_step(self):
+        self.frame += 1
+        if self.player.y + HALF_PLAYER_SIZE < self.camera.bottom:
+            self.game_over = True
+
+    def update_player(self):
+        step_player(self.player, self.inputs, self.platforms, self.walls, self.events)
+
+    def update_stars(self):
+        # generate star on jump
+        player = self.player
+        if player.dy > JUMP_DISTANCE:
+            self.stars.emit(player.x, player.y - HALF_PLAYER_SIZE,
+                            self.rng.randint(0, 360), self.rng.randrange(STAR_COLOR_COUNT))
+        self.stars.update(self.camera.bottom)
+
+    def scroll_world(self):
+        player = self.player
+        camera = self.camera
+
+        # start scrolling once the player rises above threshold
+        screen_y = camera.to_screen(player.y)
+        if not player.scroll_active and screen_y > SCROLL_THRESHOLD:
+            player.scroll_active = True
+
+        if not player.scroll_active:
+            return
+
+        # only the camera moves, world coordinates stay put
+        camera.scroll(FAST_SCROLL_SPEED if screen_y > FAST_SCROLL_Y else player.scroll_speed)
+        bottom = camera.bottom
+
+        # platform recycling
+        self.platforms.recycle(bottom, self.place_platform)
+
+        # remove bonuses that have fallen off screen
+        bonuses = self.bonuses
+        if bonuses.count:
+            bonuses.remove_rows(bonuses.rows_below("y", bottom), self.removed)
+
+    def place_platform(self, plat):
+        # next generated floor for a recycled platform
+        self.levels.place(plat)
+
+    def spawn_bonus(self):
+        # 1 in BONUS_ODDS chance per frame to put a bonus on a platform above the player
+        rng = self.rng
+        if rng.randint(1, BONUS_ODDS) != 1:
+            return
+
+        player_y = self.player.y
+        min_y = player_y + PLATFORM_GAP * 1.5
+        max_y = player_y + HALF_SCREEN_HEIGHT * 1.5
+
+        platforms = self.platforms
+        bonuses = self.bonuses
+        eligible_platforms = []
+        for floor in platforms.floors_between(min_y, max_y):
+            plat = platforms.get(floor)
+            platform_y = plat.y
+            # skip platforms that already have a bonus nearby
+            if min_y < platform_y < max_y and not bonuses.any_near(plat.x, platform_y, plat.length * 15, 50):
+                eligible_platforms.append(plat)
+
+        if not eligible_platforms:
+            return
+
+        chosen_platform = rng.choice(eligible_platforms)
+        max_offset = int(chosen_platform.length * 8)
+        bonus_x = chosen_platform.x
+        if max_offset > 0:
+            bonus_x += rng.randint(-max_offset, max_offset)
+        bonus_y = chosen_platform.y + HALF_PLAT_SIZE + 20  # slightly above platform
+
+        # kept by reference: a pickup later in the step may move its store row
+        self.spawned.append(self.add_bonus(bonus_x, bonus_y))
+        self.events.append(EVENT_BONUS_SPAWNED)
+
+    def add_bonus(self, x, y):
+        # new bonus as a store row plus the record the presentation layer sees
+        bonus = BonusState(x, y)
+        self.bonuses.add(x, y, item=bonus)
+        return bonus
+
+    def check_bonus_collision(self):
+        bonuses = self.bonuses
+        if not bonuses.count:
+            return
+        player = self.player
+        collected = bonuses.rows_within(player.x, player.y, BONUS_HITBOX)
+        for _ in collected:
+            self.score += BONUS_VALUE
+            self.events.append(EVENT_BONUS_COLLECTED)
+        bonuses.remove_rows(collected, self.removed)
+
+    def update_score(self):
+        player = self.player
+        feet_y = player.y - HALF_PLAYER_SIZE
+
+        best_floor = max(player.highest_floor, self.platforms.highest_floor_below(feet_y))
+
+        if best_floor > player.highest_floor:
+            self.score += (best_floor - player.highest_floor) * 100
+            player.highest_floor = best_floor
+
+        # increase scroll speed every SCROLL_SPEED_STEP points (difficulty scaling)
+        if self.score >= player.scroll_speed_threshold and player.scroll_speed < MAX_SCROLL_SPEED:
+            player.scroll_speed += 1
+            player.scroll_speed_threshold += SCROLL_SPEED_STEP